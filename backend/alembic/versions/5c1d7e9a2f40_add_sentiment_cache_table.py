@@ -0,0 +1,32 @@
+"""Add sentiment_cache table
+
+Revision ID: 5c1d7e9a2f40
+Revises: b8d35e24902c
+Create Date: 2025-08-02 10:14:27.512903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d7e9a2f40'
+down_revision: Union[str, None] = 'b8d35e24902c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sentiment_cache',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('sentiment_label', sa.String(), nullable=False),
+    sa.Column('sentiment_score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sentiment_cache')
@@ -0,0 +1,46 @@
+"""Add sentiment_jobs queue and sentiment_status to journal_entries
+
+Revision ID: 9a4e2b7c1d83
+Revises: 5c1d7e9a2f40
+Create Date: 2025-08-03 16:40:12.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4e2b7c1d83'
+down_revision: Union[str, None] = '5c1d7e9a2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('journal_entries', sa.Column('sentiment_status', sa.String(), nullable=True))
+    # Entries scored before this migration are complete
+    op.execute("UPDATE journal_entries SET sentiment_status = 'done' WHERE sentiment_label IS NOT NULL")
+
+    op.create_table('sentiment_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('journal_entry_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['journal_entry_id'], ['journal_entries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('journal_entry_id')
+    )
+    op.create_index(op.f('ix_sentiment_jobs_id'), 'sentiment_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_sentiment_jobs_status'), 'sentiment_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sentiment_jobs_status'), table_name='sentiment_jobs')
+    op.drop_index(op.f('ix_sentiment_jobs_id'), table_name='sentiment_jobs')
+    op.drop_table('sentiment_jobs')
+    op.drop_column('journal_entries', 'sentiment_status')
@@ -0,0 +1,48 @@
+"""Add journal_streaks table
+
+Revision ID: a6d3f8c2e5b9
+Revises: f4c7a2e9b1d6
+Create Date: 2025-08-12 09:05:37.742180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3f8c2e5b9'
+down_revision: Union[str, None] = 'f4c7a2e9b1d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Consecutive days share `day - row_number()` (gaps-and-islands); the latest island is the current streak
+BACKFILL_JOURNAL_STREAKS = (
+    "INSERT INTO journal_streaks (owner_id, current_streak, longest_streak, last_entry_date) "
+    "SELECT owner_id, (array_agg(length ORDER BY last_day DESC))[1], max(length), max(last_day) "
+    "FROM ("
+    "  SELECT owner_id, count(*) AS length, max(day) AS last_day FROM ("
+    "    SELECT owner_id, day, day - (row_number() OVER (PARTITION BY owner_id ORDER BY day))::int AS grp "
+    "    FROM (SELECT DISTINCT owner_id, date(timestamp) AS day FROM journal_entries WHERE timestamp IS NOT NULL) d"
+    "  ) r GROUP BY owner_id, grp"
+    ") islands "
+    "GROUP BY owner_id"
+)
+
+
+def upgrade() -> None:
+    op.create_table('journal_streaks',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.Column('last_entry_date', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+    # Backfill from existing entries; afterwards the app maintains streaks on journal create/delete
+    op.execute(BACKFILL_JOURNAL_STREAKS)
+
+
+def downgrade() -> None:
+    op.drop_table('journal_streaks')
@@ -0,0 +1,34 @@
+"""Add user_data_versions table
+
+Revision ID: b5e8d1f4a7c3
+Revises: a6d3f8c2e5b9
+Create Date: 2025-08-13 15:31:08.206947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8d1f4a7c3'
+down_revision: Union[str, None] = 'a6d3f8c2e5b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # No backfill needed: versions start at 0 and every write from now on increments them
+    op.create_table('user_data_versions',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('mood_version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('journal_version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('chat_version', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_data_versions')
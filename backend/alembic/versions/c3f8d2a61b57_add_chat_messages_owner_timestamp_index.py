@@ -0,0 +1,25 @@
+"""Add (owner_id, timestamp, id) index to chat_messages
+
+Revision ID: c3f8d2a61b57
+Revises: 9a4e2b7c1d83
+Create Date: 2025-08-06 09:22:48.731045
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8d2a61b57'
+down_revision: Union[str, None] = '9a4e2b7c1d83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chat_messages_owner_id_timestamp_id', 'chat_messages', ['owner_id', 'timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_owner_id_timestamp_id', table_name='chat_messages')
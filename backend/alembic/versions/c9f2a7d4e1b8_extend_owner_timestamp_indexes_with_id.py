@@ -0,0 +1,37 @@
+"""Extend mood/journal owner timestamp indexes with id for keyset pagination
+
+Revision ID: c9f2a7d4e1b8
+Revises: b5e8d1f4a7c3
+Create Date: 2025-08-14 10:12:47.390215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f2a7d4e1b8'
+down_revision: Union[str, None] = 'b5e8d1f4a7c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cursor pages filter on (timestamp, id) < cursor, which only bounds an index scan when id is
+    # part of the key. Same shape as ix_chat_messages_owner_id_timestamp_id; scanned backwards for
+    # newest-first pages. The new index is built before the old one is dropped so reads stay covered.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_mood_entries_owner_id_timestamp_id', 'mood_entries', ['owner_id', 'timestamp', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_journal_entries_owner_id_timestamp_id', 'journal_entries', ['owner_id', 'timestamp', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_mood_entries_owner_id_timestamp', table_name='mood_entries', postgresql_concurrently=True)
+        op.drop_index('ix_journal_entries_owner_id_timestamp', table_name='journal_entries', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_journal_entries_owner_id_timestamp', 'journal_entries', ['owner_id', sa.text('timestamp DESC')], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_mood_entries_owner_id_timestamp', 'mood_entries', ['owner_id', sa.text('timestamp DESC')], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_journal_entries_owner_id_timestamp_id', table_name='journal_entries', postgresql_concurrently=True)
+        op.drop_index('ix_mood_entries_owner_id_timestamp_id', table_name='mood_entries', postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""Add sentiment_source to journal_entries and sentiment_cache
+
+Revision ID: d4b8e6a1c7f3
+Revises: c9f2a7d4e1b8
+Create Date: 2025-08-15 09:41:26.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e6a1c7f3'
+down_revision: Union[str, None] = 'c9f2a7d4e1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows stay NULL: their labels may have come from the local classifier, so they
+    # aren't used as training data
+    op.add_column('journal_entries', sa.Column('sentiment_source', sa.String(), nullable=True))
+    op.add_column('sentiment_cache', sa.Column('sentiment_source', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sentiment_cache', 'sentiment_source')
+    op.drop_column('journal_entries', 'sentiment_source')
@@ -0,0 +1,35 @@
+"""Add per-user timestamp indexes and GIN index on mood tags
+
+Revision ID: d7b1e5f3a9c2
+Revises: c3f8d2a61b57
+Create Date: 2025-08-07 14:05:31.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b1e5f3a9c2'
+down_revision: Union[str, None] = 'c3f8d2a61b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY avoids locking large tables for writes; it can't run inside a transaction.
+    # chat_messages is already covered by ix_chat_messages_owner_id_timestamp_id (a B-tree
+    # can be scanned backwards, so it also serves newest-first queries).
+    with op.get_context().autocommit_block():
+        op.create_index('ix_mood_entries_owner_id_timestamp', 'mood_entries', ['owner_id', sa.text('timestamp DESC')], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_journal_entries_owner_id_timestamp', 'journal_entries', ['owner_id', sa.text('timestamp DESC')], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_mood_entries_tags_gin', 'mood_entries', ['tags'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_mood_entries_tags_gin', table_name='mood_entries', postgresql_concurrently=True)
+        op.drop_index('ix_journal_entries_owner_id_timestamp', table_name='journal_entries', postgresql_concurrently=True)
+        op.drop_index('ix_mood_entries_owner_id_timestamp', table_name='mood_entries', postgresql_concurrently=True)
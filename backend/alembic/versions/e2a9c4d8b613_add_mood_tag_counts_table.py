@@ -0,0 +1,44 @@
+"""Add mood_tag_counts table
+
+Revision ID: e2a9c4d8b613
+Revises: d7b1e5f3a9c2
+Create Date: 2025-08-08 11:47:09.604152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c4d8b613'
+down_revision: Union[str, None] = 'd7b1e5f3a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mood_tag_counts',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id', 'tag')
+    )
+    # Backfill from existing entries; afterwards the app maintains counts on mood insert/delete
+    op.execute(
+        "INSERT INTO mood_tag_counts (owner_id, tag, count) "
+        "SELECT owner_id, tag, count(*) FROM mood_entries, unnest(tags) AS tag "
+        "GROUP BY owner_id, tag"
+    )
+    # Tag insights read mood_tag_counts now, and no query filters mood_entries by tag, so the GIN
+    # index only slowed down mood inserts
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_mood_entries_tags_gin', table_name='mood_entries', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_mood_entries_tags_gin', 'mood_entries', ['tags'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+    op.drop_table('mood_tag_counts')
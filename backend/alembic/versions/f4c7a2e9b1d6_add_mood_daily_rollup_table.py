@@ -0,0 +1,39 @@
+"""Add mood_daily_rollup table
+
+Revision ID: f4c7a2e9b1d6
+Revises: e2a9c4d8b613
+Create Date: 2025-08-11 10:22:41.318507
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c7a2e9b1d6'
+down_revision: Union[str, None] = 'e2a9c4d8b613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mood_daily_rollup',
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sum', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('owner_id', 'day')
+    )
+    # Backfill from existing entries; afterwards the app maintains rollups on mood insert/delete
+    op.execute(
+        "INSERT INTO mood_daily_rollup (owner_id, day, sum, count) "
+        "SELECT owner_id, date(timestamp), sum(mood_value), count(*) FROM mood_entries "
+        "WHERE timestamp IS NOT NULL GROUP BY owner_id, date(timestamp)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('mood_daily_rollup')
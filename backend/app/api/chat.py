@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-from .. import schemas, models, crud
-from ..database import get_db
-from ..auth.routes import get_current_user
+from .. import schemas, crud
+from ..conditional import check_not_modified
+from ..database import get_db, AsyncSessionLocal
+from ..auth.routes import get_current_user, get_user_from_token
 from ..services.rag_service import chatbot_service_instance as chatbot_service # Import the singleton instance
 
 router = APIRouter(
@@ -23,8 +27,8 @@ class ChatResponse(BaseModel):
 @router.post("/", response_model=ChatResponse)
 async def chat_with_ai(
     chat_message: ChatMessageIn,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Send a message to the AI chatbot and get a response.
@@ -43,10 +47,10 @@ async def chat_with_ai(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chatbot knowledge base not found. Please run ingestion script: {e}"
         )
-    except ConnectionRefusedError as e: # Catch the specific Ollama connection error
+    except ConnectionError as e: # LLM provider unreachable (e.g. failed startup probe)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, # 503 Service Unavailable
-            detail=f"Chatbot LLM (Ollama) is not reachable or model not loaded. Please ensure Ollama is running and the '{chatbot_service.OLLAMA_MODEL_NAME}' model is pulled. Details: {e}"
+            detail=f"Chatbot LLM is not reachable. Please check the LLM_PROVIDER configuration. Details: {e}"
         )
     except Exception as e:
         print(f"Chatbot error: {e}") # Log the specific error for debugging
@@ -55,16 +59,115 @@ async def chat_with_ai(
             detail=f"An unexpected error occurred with the chatbot. Please try again. If the problem persists, contact support."
         )
 
+async def _ensure_chatbot_ready():
+    """
+    Loads the RAG stack before a stream starts so setup failures become proper HTTP errors.
+    """
+    try:
+        await chatbot_service.ensure_ready()
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Chatbot knowledge base not found. Please run ingestion script: {e}"
+        )
+    except Exception as e:
+        print(f"Chatbot initialization error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The chatbot is not available right now. Please try again shortly."
+        )
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@router.post("/stream")
+async def stream_chat_with_ai(
+    chat_message: ChatMessageIn,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events variant of POST /chat/. Emits a `sources` event once retrieval is done,
+    `token` events as the LLM generates, and `done` (with the full answer) after the
+    conversation has been stored.
+    """
+    await _ensure_chatbot_ready()
+    user_id = current_user.id
+
+    async def event_stream():
+        # The request-scoped session is closed before a streamed body is sent, so use our own
+        async with AsyncSessionLocal() as db:
+            async for event in chatbot_service.stream_chatbot_response(user_id=user_id, user_message=chat_message.message, db=db):
+                yield _format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, token: str = Query(...)):
+    """
+    WebSocket chat. Authenticate with `?token=<JWT>`, then send {"message": "..."} frames;
+    each reply is streamed back as the same JSON events as /chat/stream.
+    """
+    # Sessions are opened per use rather than for the socket's lifetime, so an idle socket never
+    # holds a pooled connection
+    async with AsyncSessionLocal() as db:
+        user = await get_user_from_token(db, token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id = user.id
+    await websocket.accept()
+
+    try:
+        try:
+            await chatbot_service.ensure_ready()
+        except Exception as e:
+            print(f"Chatbot initialization error: {e}")
+            await websocket.send_json({"type": "error", "detail": "The chatbot is not available right now. Please try again shortly."})
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+            return
+
+        while True:
+            try:
+                data = await websocket.receive_json()
+            except ValueError: # Not valid JSON
+                await websocket.send_json({"type": "error", "detail": 'Send JSON frames like {"message": "..."}.'})
+                continue
+            message = data.get("message") if isinstance(data, dict) else None
+            message = message.strip() if isinstance(message, str) else ""
+            if not message:
+                await websocket.send_json({"type": "error", "detail": "Message must not be empty."})
+                continue
+            async with AsyncSessionLocal() as db:
+                async for event in chatbot_service.stream_chatbot_response(user_id=user_id, user_message=message, db=db):
+                    await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+
 # Optional: Add an endpoint to get full chat history for a user
 @router.get("/history", response_model=List[schemas.ChatMessage])
-def get_chat_history_for_user(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 50
+async def get_chat_history_for_user(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Cursor from a previous X-Next-Cursor header")
 ):
     """
-    Retrieve past chat messages for the authenticated user.
+    Retrieve the authenticated user's most recent chat messages in chronological order.
+    If older messages exist, the X-Next-Cursor response header holds the cursor for the next page.
     """
-    messages = crud.get_user_chat_messages(db, current_user.id, skip=skip, limit=limit)
-    return messages
\ No newline at end of file
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("chat",), limit, before)
+    if not_modified:
+        return not_modified
+    try:
+        messages, next_cursor = await crud.get_user_chat_messages_page(db, current_user.id, limit=limit, before=before)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return messages
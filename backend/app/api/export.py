@@ -0,0 +1,102 @@
+import csv
+import io
+from typing import AsyncIterator, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+
+from .. import schemas, crud
+from ..database import AsyncSessionLocal
+from ..auth.routes import get_current_user
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Data Export"]
+)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+# Flush the response every this many bytes rather than once per row
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# CSV holds every dataset in one table: a "type" column plus the union of the datasets' fields
+CSV_COLUMNS = ["type"] + list(dict.fromkeys(
+    name for _, schema in crud.EXPORT_DATASETS.values() for name in schema.model_fields
+))
+
+
+def _ndjson_line(dataset: str, row: dict) -> bytes:
+    return orjson.dumps({"type": dataset, **row}, option=orjson.OPT_UTC_Z) + b"\n"
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return orjson.dumps(value).decode("utf-8") # Mood tags
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+async def _export_rows(user_id: int, datasets: Tuple[str, ...]) -> AsyncIterator[Tuple[str, dict]]:
+    # The request's get_db session is closed before the body streams, so the export owns its session
+    async with AsyncSessionLocal() as db:
+        for dataset in datasets:
+            async for row in crud.stream_user_export_rows(db, user_id, dataset):
+                yield dataset, row
+
+
+async def _ndjson_body(user_id: int, datasets: Tuple[str, ...]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for dataset, row in _export_rows(user_id, datasets):
+        buffer += _ndjson_line(dataset, row)
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def _csv_body(user_id: int, datasets: Tuple[str, ...]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    async for dataset, row in _export_rows(user_id, datasets):
+        writer.writerow({"type": dataset, **{k: _csv_value(v) for k, v in row.items()}})
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+@router.get("/")
+async def export_user_data(
+    format: str = Query("ndjson", description=f"One of: {', '.join(EXPORT_FORMATS)}"),
+    datasets: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(crud.EXPORT_DATASETS)} (default: all)"),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Download the authenticated user's full mood, journal and chat history, oldest first, as
+    NDJSON (one object per line with a "type" field) or CSV. The body is streamed from
+    server-side cursors, so the response starts immediately and memory use doesn't grow
+    with the size of the history.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown export format: {format}")
+    requested = tuple(crud.EXPORT_DATASETS)
+    if datasets:
+        requested = tuple(dict.fromkeys(d.strip() for d in datasets.split(",") if d.strip()))
+        unknown = [d for d in requested if d not in crud.EXPORT_DATASETS]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown export datasets: {', '.join(unknown)}")
+
+    body = _ndjson_body if format == "ndjson" else _csv_body
+    return StreamingResponse(
+        body(current_user.id, requested),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="mental-health-export.{format}"'}
+    )
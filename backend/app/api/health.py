@@ -0,0 +1,43 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from .. import metrics
+from ..services.nlp_service import nlp_service_instance as nlp_service
+from ..services.rag_service import chatbot_service_instance as chatbot_service
+
+router = APIRouter(
+    prefix="/health",
+    tags=["Health"]
+)
+
+@router.get("/live")
+def liveness():
+    """
+    Liveness probe: the worker is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+def readiness():
+    """
+    Readiness probe: reports the warm-up state of the NLP and RAG services.
+    Returns 503 until every component is ready; mood/journal/auth endpoints are servable regardless.
+    """
+    components = {
+        "nlp": {"status": nlp_service.status, "error": nlp_service.init_error},
+        "chatbot": {"status": chatbot_service.status, "error": chatbot_service.init_error},
+    }
+    ready = all(c["status"] == "ready" for c in components.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "warming", "components": components}
+    )
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    Process-local counters (cache hits/misses, lookups...) for this worker, plus the hit rate
+    of every cache that counts hits and misses.
+    """
+    return {**metrics.snapshot(), **metrics.hit_rates()}
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 
-from .. import crud, models
+from .. import crud, schemas
+from ..conditional import check_not_modified
 from ..database import get_db
 from ..auth.routes import get_current_user # Dependency to protect routes
 
@@ -12,32 +13,73 @@ router = APIRouter(
 )
 
 @router.get("/mood/tags", response_model=List[Dict[str, Any]])
-def get_mood_tags_insights(
+async def get_mood_tags_insights(
+    request: Request,
+    response: Response,
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Retrieves the most frequent mood tags for the authenticated user.
     """
-    return crud.get_most_frequent_mood_tags(db=db, user_id=current_user.id, limit=limit)
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("mood",), limit)
+    if not_modified:
+        return not_modified
+    return await crud.get_most_frequent_mood_tags(db=db, user_id=current_user.id, limit=limit)
 
 @router.get("/mood/avg-by-day", response_model=List[Dict[str, Any]])
-def get_average_mood_by_day_of_week_api(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def get_average_mood_by_day_of_week_api(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Calculates the average mood for each day of the week for the authenticated user.
     """
-    return crud.get_average_mood_by_day_of_week(db=db, user_id=current_user.id)
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("mood",))
+    if not_modified:
+        return not_modified
+    return await crud.get_average_mood_by_day_of_week(db=db, user_id=current_user.id)
 
 @router.get("/journal/sentiment-summary", response_model=Dict[str, Any])
-def get_journal_sentiment_summary_api(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def get_journal_sentiment_summary_api(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Provides a basic summary of journal sentiment distribution for the authenticated user.
     """
-    return crud.get_journal_sentiment_summary(db=db, user_id=current_user.id)
\ No newline at end of file
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("journal",))
+    if not_modified:
+        return not_modified
+    return await crud.get_journal_sentiment_summary(db=db, user_id=current_user.id)
+
+@router.get("/dashboard", response_model=Dict[str, Any])
+async def get_insights_dashboard_api(
+    request: Request,
+    response: Response,
+    sections: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(crud.DASHBOARD_SECTIONS)} (default: all)"),
+    tag_limit: int = Query(5, ge=1, le=20),
+    trend_days: int = Query(7, ge=1, le=365),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Everything the dashboard shows (mood tags, average mood by weekday, journal sentiment summary,
+    mood trends and journal streak) computed in one database round-trip. Each section has the same
+    shape as its standalone endpoint.
+    """
+    requested = crud.DASHBOARD_SECTIONS
+    if sections:
+        requested = tuple(dict.fromkeys(s.strip() for s in sections.split(",") if s.strip()))
+        unknown = [s for s in requested if s not in crud.DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown dashboard sections: {', '.join(unknown)}")
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("mood", "journal"), requested, tag_limit, trend_days, daily=True)
+    if not_modified:
+        return not_modified
+    return await crud.get_insights_dashboard(db=db, user_id=current_user.id, sections=requested, tag_limit=tag_limit, trend_days=trend_days)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 
-from .. import schemas, crud, models
-from ..database import get_db
+from .. import schemas, crud
+from ..conditional import check_not_modified
+from ..database import AsyncSessionLocal, get_db
+from ..config import settings
+from ..responses import fast_json_response
 from ..auth.routes import get_current_user # Import the dependency
+from ..services.sentiment_worker import sentiment_worker
+from ..services.sentiment_backfill import backfill_journal_sentiment
 
 router = APIRouter(
     prefix="/journal",
@@ -15,37 +20,66 @@ router = APIRouter(
 @router.post("/", response_model=schemas.JournalEntry, status_code=status.HTTP_201_CREATED)
 async def create_journal_entry( # <-- MAKE ASYNC
     journal_entry: schemas.JournalEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Create a new journal entry for the authenticated user with sentiment analysis.
+    The entry is saved right away; unless the text is already cached its sentiment is
+    'pending' and filled in by the background worker.
     """
-    return await crud.create_user_journal_entry(db=db, journal_entry=journal_entry, user_id=current_user.id) # <-- AWAIT
+    db_journal_entry = await crud.create_user_journal_entry(db=db, journal_entry=journal_entry, user_id=current_user.id) # <-- AWAIT
+    if db_journal_entry.sentiment_status == "pending":
+        sentiment_worker.notify()
+    return db_journal_entry
 
 @router.get("/", response_model=List[schemas.JournalEntry])
-def read_journal_entries(
-    skip: int = Query(0, ge=0),
+async def read_journal_entries(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging (deprecated: use the cursor in X-Next-Cursor instead)"),
     limit: int = Query(100, ge=0, le=100),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    before: Optional[str] = Query(None, description="Cursor from a previous X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
-    Retrieve all journal entries for the authenticated user.
+    Retrieve the authenticated user's journal entries, newest first.
+    If older entries exist, the X-Next-Cursor response header holds the cursor for the next page.
     """
-    journal_entries = crud.get_user_journal_entries(db=db, user_id=current_user.id, skip=skip, limit=limit)
+    if skip and before is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or before, not both")
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("journal",), skip, limit, before)
+    if not_modified:
+        return not_modified
+    if skip:
+        if settings.FAST_JSON_RESPONSES:
+            rows = await crud.get_user_journal_entry_rows(db=db, user_id=current_user.id, skip=skip, limit=limit)
+            return fast_json_response(rows, response)
+        return await crud.get_user_journal_entries(db=db, user_id=current_user.id, skip=skip, limit=limit)
+
+    try:
+        journal_entries, next_cursor = await crud.get_user_journal_entries_page(
+            db=db, user_id=current_user.id, limit=limit, before=before, lean=settings.FAST_JSON_RESPONSES
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(journal_entries, response)
     return journal_entries
 
 @router.get("/{journal_entry_id}", response_model=schemas.JournalEntry)
-def read_journal_entry(
+async def read_journal_entry(
     journal_entry_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Retrieve a specific journal entry by ID for the authenticated user.
     """
-    db_journal_entry = crud.get_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
+    db_journal_entry = await crud.get_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
     if db_journal_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal entry not found")
     return db_journal_entry
@@ -54,42 +88,77 @@ def read_journal_entry(
 async def update_journal_entry( # <-- MAKE ASYNC
     journal_entry_id: int,
     update_data: Dict[str, Any],
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Update a specific journal entry by ID for the authenticated user with sentiment re-analysis.
     Supports partial updates.
     """
-    db_journal_entry = crud.get_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
+    db_journal_entry = await crud.get_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
     if db_journal_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal entry not found")
 
     updated_entry = await crud.update_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id, update_data=update_data) # <-- AWAIT
+    if updated_entry.sentiment_status == "pending":
+        sentiment_worker.notify()
     return updated_entry
 
 @router.delete("/{journal_entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_journal_entry(
+async def delete_journal_entry(
     journal_entry_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Delete a specific journal entry by ID for the authenticated user.
     """
-    db_journal_entry = crud.delete_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
+    db_journal_entry = await crud.delete_user_journal_entry(db=db, journal_entry_id=journal_entry_id, user_id=current_user.id)
     if db_journal_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Journal entry not found")
     return
 
 # --- NEW ROUTE for Journal Streak ---
-@router.get("/streak/", response_model=Dict[str, int]) # Returns a dictionary like {"streak": 5}
-def get_journal_streak_api(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+@router.get("/streak/", response_model=Dict[str, int]) # Returns a dictionary like {"streak": 5, "longest_streak": 12}
+async def get_journal_streak_api(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """
+    Retrieve the current (and longest) consecutive daily journal streak for the authenticated user.
+    """
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("journal",), daily=True)
+    if not_modified:
+        return not_modified
+    return await crud.get_journal_streak_state(db=db, user_id=current_user.id) # {"streak": 5, "longest_streak": 12}
+
+# --- NEW ROUTE for Sentiment Backfill ---
+async def _run_sentiment_backfill(user_id: int):
+    # Runs after the response is sent, when the request's session is already closed
+    async with AsyncSessionLocal() as db:
+        stats = await backfill_journal_sentiment(db=db, user_id=user_id)
+    print(f"Sentiment backfill for user {user_id} complete: {stats}")
+
+@router.post("/sentiment/backfill", response_model=Dict[str, int], status_code=status.HTTP_202_ACCEPTED)
+async def backfill_journal_sentiment_api(
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
-    Retrieve the current consecutive daily journal streak for the authenticated user.
+    Schedule scoring of the authenticated user's journal entries that have no sentiment yet and
+    return how many were queued. With SENTIMENT_ASYNC they go to the background sentiment worker;
+    otherwise a background task scores them with batched LLM calls after the response is sent.
+    For all users at once, run `python backfill_sentiment.py` from the backend directory.
     """
-    streak = crud.get_journal_streak(db=db, user_id=current_user.id)
-    return {"streak": streak}
+    if settings.SENTIMENT_ASYNC:
+        queued = await crud.queue_missing_sentiment_jobs(db=db, user_id=current_user.id)
+        if queued:
+            sentiment_worker.notify()
+        return {"queued": queued}
+    queued = await crud.count_journal_entries_missing_sentiment(db=db, user_id=current_user.id)
+    if queued:
+        background_tasks.add_task(_run_sentiment_backfill, current_user.id)
+    return {"queued": queued}
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any # <-- ensure Dict, Any are imported if not already
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional # <-- ensure Dict, Any are imported if not already
 
-from .. import schemas, crud, models
+from .. import schemas, crud
+from ..conditional import check_not_modified
 from ..database import get_db
+from ..config import settings
+from ..responses import fast_json_response
 from ..auth.routes import get_current_user # Import the dependency
 
 router = APIRouter(
@@ -12,66 +15,95 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=schemas.MoodEntry, status_code=status.HTTP_201_CREATED)
-def create_mood_entry(
+async def create_mood_entry(
     mood_entry: schemas.MoodEntryCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Create a new mood entry for the authenticated user.
     """
-    return crud.create_user_mood_entry(db=db, mood_entry=mood_entry, user_id=current_user.id)
+    return await crud.create_user_mood_entry(db=db, mood_entry=mood_entry, user_id=current_user.id)
 
 @router.get("/", response_model=List[schemas.MoodEntry])
-def read_mood_entries(
-    skip: int = Query(0, ge=0),
+async def read_mood_entries(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging (deprecated: use the cursor in X-Next-Cursor instead)"),
     limit: int = Query(100, ge=0, le=100),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    before: Optional[str] = Query(None, description="Cursor from a previous X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
-    Retrieve all mood entries for the authenticated user.
+    Retrieve the authenticated user's mood entries, newest first.
+    If older entries exist, the X-Next-Cursor response header holds the cursor for the next page.
     """
-    mood_entries = crud.get_user_mood_entries(db=db, user_id=current_user.id, skip=skip, limit=limit)
+    if skip and before is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either skip or before, not both")
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("mood",), skip, limit, before)
+    if not_modified:
+        return not_modified
+    if skip:
+        if settings.FAST_JSON_RESPONSES:
+            rows = await crud.get_user_mood_entry_rows(db=db, user_id=current_user.id, skip=skip, limit=limit)
+            return fast_json_response(rows, response)
+        return await crud.get_user_mood_entries(db=db, user_id=current_user.id, skip=skip, limit=limit)
+
+    try:
+        mood_entries, next_cursor = await crud.get_user_mood_entries_page(
+            db=db, user_id=current_user.id, limit=limit, before=before, lean=settings.FAST_JSON_RESPONSES
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if settings.FAST_JSON_RESPONSES:
+        return fast_json_response(mood_entries, response)
     return mood_entries
 
 @router.get("/{mood_entry_id}", response_model=schemas.MoodEntry)
-def read_mood_entry(
+async def read_mood_entry(
     mood_entry_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Retrieve a specific mood entry by ID for the authenticated user.
     """
-    db_mood_entry = crud.get_user_mood_entry(db=db, mood_entry_id=mood_entry_id, user_id=current_user.id)
+    db_mood_entry = await crud.get_user_mood_entry(db=db, mood_entry_id=mood_entry_id, user_id=current_user.id)
     if db_mood_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mood entry not found")
     return db_mood_entry
 
 @router.delete("/{mood_entry_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_mood_entry(
+async def delete_mood_entry(
     mood_entry_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Delete a specific mood entry by ID for the authenticated user.
     """
-    db_mood_entry = crud.delete_user_mood_entry(db=db, mood_entry_id=mood_entry_id, user_id=current_user.id)
+    db_mood_entry = await crud.delete_user_mood_entry(db=db, mood_entry_id=mood_entry_id, user_id=current_user.id)
     if db_mood_entry is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Mood entry not found")
     return
 
 # --- NEW ROUTE for Mood Trends ---
 @router.get("/trends/", response_model=List[Dict[str, Any]]) # Or define a new Pydantic schema for this
-def get_mood_trends_api(
+async def get_mood_trends_api(
+    request: Request,
+    response: Response,
     days: int = Query(7, ge=1, le=365), # Number of days to look back
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Retrieve aggregated daily average mood trends for the authenticated user.
     """
-    trends = crud.get_mood_trends(db=db, user_id=current_user.id, days=days)
+    not_modified = await check_not_modified(request, response, db, current_user.id, ("mood",), days, daily=True)
+    if not_modified:
+        return not_modified
+    trends = await crud.get_mood_trends(db=db, user_id=current_user.id, days=days)
     return trends
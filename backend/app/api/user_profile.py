@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 
-from .. import schemas, crud, models
+from .. import schemas, crud
 from ..database import get_db
 from ..auth.routes import get_current_user # Import the dependency
 
@@ -12,8 +12,8 @@ router = APIRouter(
 )
 
 @router.get("/me", response_model=schemas.User)
-def read_current_user_profile(
-    current_user: models.User = Depends(get_current_user)
+async def read_current_user_profile(
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Retrieve the profile of the authenticated user.
@@ -21,13 +21,15 @@ def read_current_user_profile(
     return current_user
 
 @router.put("/me", response_model=schemas.User)
-def update_current_user_profile(
+async def update_current_user_profile(
     profile_data: schemas.UserProfileUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Update the profile of the authenticated user.
     """
-    updated_user = crud.update_user_profile(db=db, user=current_user, profile_data=profile_data)
+    updated_user = await crud.update_user_profile(db=db, user_id=current_user.id, profile_data=profile_data)
+    if updated_user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return updated_user
@@ -0,0 +1,42 @@
+# backend/app/auth/principal_cache.py
+
+import threading
+from typing import Optional
+
+from cachetools import TTLCache
+
+from .. import metrics, schemas
+from ..config import settings
+
+
+class PrincipalCache:
+    """
+    In-process TTL + LRU cache of authenticated users, so protected requests don't have to
+    read the users table every time. Entries are `schemas.User` snapshots keyed by user id;
+    tokens without a `uid` claim are resolved through a secondary email -> id map.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._by_id = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._id_by_email = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Optional[int] = None, email: Optional[str] = None) -> Optional[schemas.User]:
+        with self._lock:
+            if user_id is None and email is not None:
+                user_id = self._id_by_email.get(email)
+            principal = self._by_id.get(user_id) if user_id is not None else None
+        metrics.incr("auth.principal_cache.hit" if principal is not None else "auth.principal_cache.miss")
+        return principal
+
+    def put(self, principal: schemas.User):
+        with self._lock:
+            self._by_id[principal.id] = principal
+            self._id_by_email[principal.email] = principal.id
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._by_id.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
+from typing import Optional
 
-from .. import schemas, crud, models
+from .. import schemas, crud, metrics
 from ..database import get_db
 from ..config import settings
 from . import security # Import security module
+from .principal_cache import principal_cache
 
 router = APIRouter(
     prefix="/auth", # All routes in this router will start with /auth
@@ -17,50 +19,83 @@ router = APIRouter(
 # The tokenUrl points to your login endpoint that issues the token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+async def get_user_from_token(db: AsyncSession, token: str) -> Optional[schemas.User]:
+    """
+    Resolves a JWT to its user, or None if the token is invalid or the user no longer exists.
+    Shared by the HTTP dependency below and WebSocket endpoints (which can't use OAuth2PasswordBearer).
+    Served from the principal cache when possible; otherwise the user is loaded by id (tokens with a
+    `uid` claim) or by email and cached.
+    """
+    token_data = security.decode_access_token(token)
+    if token_data is None or token_data.get("email") is None:
+        return None
+    principal = principal_cache.get(user_id=token_data["user_id"], email=token_data["email"])
+    if principal is not None and principal.email == token_data["email"]:
+        return principal
+
+    metrics.incr("auth.user_lookup")
+    if token_data["user_id"] is not None:
+        user = await crud.get_user(db, user_id=token_data["user_id"])
+        if user is not None and user.email != token_data["email"]:
+            user = None # Id no longer belongs to the token's subject
+    else:
+        user = await crud.get_user_by_email(db, email=token_data["email"])
+    if user is None:
+        return None
+    principal = schemas.User.model_validate(user)
+    principal_cache.put(principal)
+    return principal
+
 # Dependency to get the current authenticated user
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    token_data = security.decode_access_token(token)
-    if token_data is None or token_data.get("email") is None:
-        raise credentials_exception
-
-    user = crud.get_user_by_email(db, email=token_data["email"])
+    user = await get_user_from_token(db, token)
     if user is None:
         raise credentials_exception
     return user
 
 # Route for user registration
 @router.post("/register", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    return crud.create_user(db=db, user=user)
+    return await crud.create_user(db=db, user=user)
 
 # Route for user login and token generation
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_email(db, email=form_data.username) # OAuth2 spec uses 'username' for email
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await crud.get_user_by_email(db, email=form_data.username) # OAuth2 spec uses 'username' for email
+    verified, new_hash = False, None
+    if user:
+        # bcrypt runs in the password thread pool so other requests keep being served during login bursts
+        verified, new_hash = await security.verify_and_update_password(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        await crud.update_user_password_hash(db, user, new_hash)
+        metrics.incr("auth.password_rehashed")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    token_claims = {"sub": user.email}
+    if settings.EMBED_USER_ID_IN_TOKEN:
+        token_claims["uid"] = user.id
     access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=token_claims, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Example of a protected route to test authentication
 @router.get("/users/me/", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: schemas.User = Depends(get_current_user)):
     return current_user
\ No newline at end of file
@@ -1,12 +1,25 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from ..config import settings # Relative import to app/config.py
 
-# Password hashing context (using bcrypt)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing context (using bcrypt). Pinning min/max rounds to BCRYPT_ROUNDS makes
+# verify_and_update flag hashes made with any other cost, so a cost change is applied on next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is ~250ms of CPU per call at cost 12; run it here rather than on the event loop.
+# The pool size also bounds how many hashes a login burst can compute at once.
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 
 # --- Password Hashing Functions ---
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -15,6 +28,22 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+async def _run_in_password_executor(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_in_password_executor(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_in_password_executor(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password off the event loop. Returns (verified, new_hash), where new_hash is set
+    when the stored hash uses an outdated scheme or bcrypt cost and should be replaced.
+    """
+    return await _run_in_password_executor(pwd_context.verify_and_update, plain_password, hashed_password)
+
 # --- JWT Token Functions ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -32,6 +61,6 @@ def decode_access_token(token: str):
         email: str = payload.get("sub")
         if email is None:
             return None # Or raise an exception
-        return {"email": email}
+        return {"email": email, "user_id": payload.get("uid")} # uid is absent from tokens issued without EMBED_USER_ID_IN_TOKEN
     except JWTError:
         return None # Or raise an exception for invalid token
\ No newline at end of file
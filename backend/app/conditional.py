@@ -0,0 +1,55 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import crud
+
+# HTTP conditional GET for per-user read endpoints. ETags are derived from the user's data
+# versions (bumped in the same transaction as every write) plus the request parameters, so
+# checking one costs a single-row read instead of re-running and re-serializing the query.
+
+def make_etag(user_id: int, versions: Dict[str, int], domains: Sequence[str], *params: Any, daily: bool = False) -> str:
+    """
+    Weak ETag for a response built from `domains` of the user's data. Set `daily` for responses
+    that are relative to today's date (trends, streaks) so they turn over at midnight.
+    """
+    parts = [user_id, [versions[d] for d in domains], params]
+    if daily:
+        parts.append(datetime.now().date().isoformat())
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Sets the ETag on `response` and returns a 304 response to send instead when the client's copy
+    is current; otherwise None and the endpoint builds its normal body.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"} # Browsers revalidate before reusing
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+async def check_not_modified(
+    request: Request, response: Response, db: AsyncSession, user_id: int, domains: Sequence[str], *params: Any, daily: bool = False
+) -> Optional[Response]:
+    """
+    Endpoint helper: reads the user's data versions and returns a 304 to send if the client's copy
+    (If-None-Match) is current. Otherwise sets the ETag header and returns None.
+    """
+    versions = await crud.get_data_versions(db, user_id)
+    return conditional_response(request, response, make_etag(user_id, versions, domains, *params, daily=daily))
@@ -9,6 +9,80 @@ class Settings:
     ALGORITHM: str = os.getenv("ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # --- Password hashing ---
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12")) # Changing this rehashes each password on its owner's next login
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4")) # Threads for bcrypt work (bcrypt releases the GIL)
+
+    # --- Authenticated-user (principal) cache ---
+    EMBED_USER_ID_IN_TOKEN: bool = os.getenv("EMBED_USER_ID_IN_TOKEN", "true").lower() == "true" # Adds a `uid` claim so lookups go by primary key
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60")) # 0 disables the cache
+
+    # --- Async database engine (asyncpg) connection pool ---
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")) # Reconnect before server/proxy idle timeouts
+    DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true" # Check connections on checkout
+    DB_ECHO: bool = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # --- LLM provider configuration ---
+    # "gemini" uses Google Gemini; "fake" is a local deterministic stand-in for load tests/benchmarks
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini").lower()
+    GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
+    GEMINI_MODEL_NAME: str = os.getenv("GEMINI_MODEL_NAME", "gemini-2.0-flash")
+    FAKE_LLM_LATENCY_MS: int = int(os.getenv("FAKE_LLM_LATENCY_MS", "0")) # Simulated per-call latency for the fake provider
+    LLM_STARTUP_PROBE: bool = os.getenv("LLM_STARTUP_PROBE", "false").lower() == "true" # Send a test prompt when the LLM is created
+
+    # Serialize responses with orjson, and build list responses from column-selected rows instead of ORM objects
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+    # Rows fetched per round-trip by the server-side cursors behind GET /export
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # Warm NLP/RAG services in a background task at startup (otherwise they load on first use)
+    WARM_SERVICES_ON_STARTUP: bool = os.getenv("WARM_SERVICES_ON_STARTUP", "true").lower() == "true"
+
+    # --- Sentiment result cache (keyed by content hash) ---
+    SENTIMENT_CACHE_SIZE: int = int(os.getenv("SENTIMENT_CACHE_SIZE", "2048"))
+    SENTIMENT_CACHE_TTL_SECONDS: int = int(os.getenv("SENTIMENT_CACHE_TTL_SECONDS", "86400"))
+    SENTIMENT_CACHE_PERSISTENT: bool = os.getenv("SENTIMENT_CACHE_PERSISTENT", "false").lower() == "true" # Also store results in the sentiment_cache table
+
+    # --- Background sentiment analysis (journal writes return before the LLM call) ---
+    SENTIMENT_ASYNC: bool = os.getenv("SENTIMENT_ASYNC", "true").lower() == "true"
+    SENTIMENT_WORKER_CONCURRENCY: int = int(os.getenv("SENTIMENT_WORKER_CONCURRENCY", "4"))
+    SENTIMENT_WORKER_POLL_SECONDS: float = float(os.getenv("SENTIMENT_WORKER_POLL_SECONDS", "5"))
+    SENTIMENT_WORKER_SHUTDOWN_SECONDS: float = float(os.getenv("SENTIMENT_WORKER_SHUTDOWN_SECONDS", "10")) # Grace period for in-flight jobs on shutdown
+    SENTIMENT_JOB_LEASE_SECONDS: int = int(os.getenv("SENTIMENT_JOB_LEASE_SECONDS", "120"))
+    SENTIMENT_JOB_MAX_ATTEMPTS: int = int(os.getenv("SENTIMENT_JOB_MAX_ATTEMPTS", "3"))
+    SENTIMENT_BATCH_SIZE: int = int(os.getenv("SENTIMENT_BATCH_SIZE", "20")) # Entries packed into one LLM call by analyze_sentiment_batch
+
+    # --- Per-user insights/trends result cache ---
+    # "memory" (per process), "redis" (shared by all workers; needs the redis package) or "none"
+    INSIGHTS_CACHE_BACKEND: str = os.getenv("INSIGHTS_CACHE_BACKEND", "memory").lower()
+    INSIGHTS_CACHE_REDIS_URL: str = os.getenv("INSIGHTS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    INSIGHTS_CACHE_SIZE: int = int(os.getenv("INSIGHTS_CACHE_SIZE", "10000"))
+    INSIGHTS_CACHE_TTL_SECONDS: int = int(os.getenv("INSIGHTS_CACHE_TTL_SECONDS", "300")) # How long entries live; 0 disables the cache
+
+    # --- Embeddings and local sentiment classifier ---
+    EMBEDDING_MODEL_NAME: str = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+    # "torch" (sentence-transformers) or "onnx" (onnxruntime with the model repo's ONNX export)
+    EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    EMBEDDING_ONNX_INT8: bool = os.getenv("EMBEDDING_ONNX_INT8", "false").lower() == "true" # Use the int8-quantized ONNX export (re-embeds the knowledge base)
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    EMBEDDING_THREADS: int = int(os.getenv("EMBEDDING_THREADS", "0")) # Intra-op threads; 0 uses the runtime's default (all cores)
+    RETRIEVER_CACHE_SIZE: int = int(os.getenv("RETRIEVER_CACHE_SIZE", "1024")) # Cached question embeddings/top-k results; 0 disables
+
+    # --- Semantic chat response cache (knowledge-only questions; see services/response_cache.py) ---
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true" # Such answers are then generated without the user's mood/journal context
+    RESPONSE_CACHE_SIMILARITY: float = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95")) # Minimum cosine similarity to reuse an answer
+    RESPONSE_CACHE_TTL_SECONDS: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+    # "llm" (Gemini only), "local" (embedding classifier only) or "hybrid" (local, escalating low-confidence texts to the LLM)
+    SENTIMENT_MODE: str = os.getenv("SENTIMENT_MODE", "llm").lower()
+    SENTIMENT_CLASSIFIER_PATH: str = os.getenv("SENTIMENT_CLASSIFIER_PATH", "./ml_models/sentiment_head.joblib")
+    SENTIMENT_LOCAL_MIN_CONFIDENCE: float = float(os.getenv("SENTIMENT_LOCAL_MIN_CONFIDENCE", "0.75"))
+
     # Add a print statement here to see what's loaded
     def __init__(self):
         print(f"DEBUG (config.py): DATABASE_URL found: {self.DATABASE_URL is not None}")
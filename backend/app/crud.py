@@ -1,293 +1,747 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 # --- MODIFIED: Add DATE import ---
-from sqlalchemy import func, extract, DATE # <-- ADD DATE here
+from sqlalchemy import func, extract, case, literal, literal_column, Date, DateTime, Integer, select, update, delete, or_, and_, tuple_
 from sqlalchemy.dialects import postgresql # <-- ADD THIS IMPORT for postgresql dialect specific functions
 # --- END MODIFIED ---
 from datetime import datetime, timedelta, date # <-- ADD date import here
-from typing import List, Dict, Any, Optional
+from collections import Counter
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 
 from . import models, schemas
 from .auth import security # Import security for password hashing
+from .auth.principal_cache import principal_cache
+from .config import settings
+from .pagination import encode_cursor, decode_cursor
 
 # --- NEW IMPORT for NLP Service ---
 from app.services.nlp_service import nlp_service_instance as nlp_service # <-- ADD THIS IMPORT
+from app.services.insights_cache import insights_cache
+from app.services.sentiment_cache import sentiment_cache, content_hash
+from . import metrics
 # --- END NEW IMPORT ---
 
+# --- Per-user data versions (ETags) ---
+DATA_DOMAINS = ("mood", "journal", "chat")
+
+async def _bump_data_version(db: AsyncSession, user_id: int, domain: str):
+    """
+    Increments one of the user's data versions in the caller's transaction, so the new
+    version becomes visible together with the write it describes.
+    """
+    db.info.get("data_versions", {}).pop(user_id, None) # Drop the session's memoized read
+    column = f"{domain}_version"
+    stmt = postgresql.insert(models.UserDataVersion).values(owner_id=user_id, **{column: 1})
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["owner_id"],
+        set_={column: getattr(models.UserDataVersion, column) + 1}
+    ))
+
+async def get_data_versions(db: AsyncSession, user_id: int) -> Dict[str, int]:
+    """
+    Memoized on the session until one of its writes bumps a version, so the ETag check and the
+    insights cache lookup in the same request share a single read.
+    """
+    memo = db.info.setdefault("data_versions", {})
+    if user_id in memo:
+        return dict(memo[user_id])
+    row = (await db.execute(
+        select(models.UserDataVersion.mood_version, models.UserDataVersion.journal_version, models.UserDataVersion.chat_version)
+        .where(models.UserDataVersion.owner_id == user_id)
+    )).first()
+    if row is None:
+        versions = {domain: 0 for domain in DATA_DOMAINS} # User hasn't written anything yet
+    else:
+        versions = {"mood": row.mood_version, "journal": row.journal_version, "chat": row.chat_version}
+    memo[user_id] = versions
+    return dict(versions)
+
+insights_cache.set_versions(get_data_versions) # Insight results are cached per data version
+
+def _schema_columns(model, schema) -> List[Any]:
+    # The model columns a response schema exposes, in schema order
+    return [getattr(model, name) for name in schema.model_fields]
+
+# --- Keyset pagination and export ---
+async def _keyset_page(db: AsyncSession, query, model, limit: int, before: Optional[str], lean: bool = False) -> Tuple[List[Any], Optional[str]]:
+    """
+    Newest-first page of `query` (already filtered to one owner) plus the cursor for the next,
+    older page, or None when the history is exhausted. Backed by the model's
+    (owner_id, timestamp, id) index, so deep pages cost the same as the first one.
+    """
+    if before is not None:
+        before_timestamp, before_id = decode_cursor(before)
+        query = query.where(tuple_(model.timestamp, model.id) < tuple_(before_timestamp, before_id))
+    result = await db.execute(
+        query.order_by(model.timestamp.desc(), model.id.desc())
+        .limit(limit + 1) # One extra row tells us whether an older page exists
+    )
+    rows = [dict(row) for row in result.mappings()] if lean else result.scalars().all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor(last["timestamp"], last["id"]) if lean else encode_cursor(last.timestamp, last.id)
+    return page, next_cursor
+
+EXPORT_DATASETS = {
+    "mood": (models.MoodEntry, schemas.MoodEntry),
+    "journal": (models.JournalEntry, schemas.JournalEntry),
+    "chat": (models.ChatMessage, schemas.ChatMessage),
+}
+
+async def stream_user_export_rows(db: AsyncSession, user_id: int, dataset: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yields every row of one of the user's EXPORT_DATASETS as a dict, oldest first. Rows come
+    from a server-side cursor EXPORT_BATCH_SIZE at a time, so memory stays flat however long
+    the history is.
+    """
+    model, schema = EXPORT_DATASETS[dataset]
+    result = await db.stream(
+        select(*_schema_columns(model, schema))
+        .where(model.owner_id == user_id)
+        .order_by(model.timestamp, model.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    async for row in result.mappings():
+        yield dict(row)
+
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
 # Function to get a user by email
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
 
 # Function to create a new user
-def create_user(db: Session, user: schemas.UserCreate):
+async def create_user(db: AsyncSession, user: schemas.UserCreate):
     # Hash the password before storing it
-    hashed_password = security.get_password_hash(user.password)
+    hashed_password = await security.get_password_hash_async(user.password)
     db_user = models.User(email=user.email, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user) # Refresh the instance to get the new ID from the DB
+    await db.commit()
+    await db.refresh(db_user) # Refresh the instance to get the new ID from the DB
     return db_user
 
+async def update_user_password_hash(db: AsyncSession, user: models.User, hashed_password: str):
+    # Used to transparently upgrade hashes (e.g. after a BCRYPT_ROUNDS change) on login
+    await db.execute(
+        update(models.User).where(models.User.id == user.id).values(hashed_password=hashed_password)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    user.hashed_password = hashed_password
+
 # Add other CRUD operations as needed later (e.g., get_user_by_id, update_user)
 
 
 # --- CRUD for MoodEntry ---
-def create_user_mood_entry(db: Session, mood_entry: schemas.MoodEntryCreate, user_id: int):
+async def _adjust_mood_tag_counts(db: AsyncSession, user_id: int, tags: Optional[List[str]], sign: int):
+    """
+    Adds (sign=1) or removes (sign=-1) an entry's tags from mood_tag_counts in the caller's transaction.
+    Duplicate tags within an entry count once per occurrence, matching unnest() semantics.
+    """
+    tag_counts = Counter(tags or [])
+    if not tag_counts:
+        return
+    stmt = postgresql.insert(models.MoodTagCount).values([
+        {"owner_id": user_id, "tag": tag, "count": sign * n} for tag, n in tag_counts.items()
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["owner_id", "tag"],
+        set_={"count": models.MoodTagCount.count + stmt.excluded.count}
+    ))
+    if sign < 0:
+        await db.execute(
+            delete(models.MoodTagCount)
+            .where(models.MoodTagCount.owner_id == user_id, models.MoodTagCount.tag.in_(list(tag_counts)), models.MoodTagCount.count <= 0)
+        )
+
+async def _adjust_mood_daily_rollup(db: AsyncSession, owner_id: int, day, mood_value: int, sign: int):
+    """
+    Adds (sign=1) or removes (sign=-1) a mood entry from its day's row in mood_daily_rollup,
+    in the caller's transaction. `day` is the entry's date() as computed in SQL from the stored timestamp.
+    """
+    rollup = models.MoodDailyRollup
+    stmt = postgresql.insert(rollup).values(owner_id=owner_id, day=day, sum=sign * mood_value, count=sign)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["owner_id", "day"],
+        set_={"sum": rollup.sum + stmt.excluded.sum, "count": rollup.count + stmt.excluded.count}
+    ))
+    if sign < 0:
+        await db.execute(
+            delete(rollup).where(rollup.owner_id == owner_id, rollup.day == day, rollup.count <= 0)
+        )
+
+async def create_user_mood_entry(db: AsyncSession, mood_entry: schemas.MoodEntryCreate, user_id: int):
     db_mood_entry = models.MoodEntry(**mood_entry.dict(), owner_id=user_id)
     db.add(db_mood_entry)
-    db.commit()
-    db.refresh(db_mood_entry)
+    await _adjust_mood_tag_counts(db, user_id, db_mood_entry.tags, sign=1)
+    await db.flush() # Inserts the entry so the rollup can read its server-side timestamp
+    day = select(func.date(models.MoodEntry.timestamp)).where(models.MoodEntry.id == db_mood_entry.id).scalar_subquery()
+    await _adjust_mood_daily_rollup(db, user_id, day, db_mood_entry.mood_value, sign=1)
+    await _bump_data_version(db, user_id, "mood")
+    await db.commit()
+    await db.refresh(db_mood_entry)
     return db_mood_entry
 
-def get_user_mood_entries(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.MoodEntry).filter(models.MoodEntry.owner_id == user_id).order_by(models.MoodEntry.timestamp.desc()).offset(skip).limit(limit).all()
+async def get_user_mood_entries(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(models.MoodEntry).where(models.MoodEntry.owner_id == user_id).order_by(models.MoodEntry.timestamp.desc()).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
-def get_user_mood_entry(db: Session, mood_entry_id: int, user_id: int):
-    return db.query(models.MoodEntry).filter(models.MoodEntry.id == mood_entry_id, models.MoodEntry.owner_id == user_id).first()
+async def get_user_mood_entry_rows(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Lean variant of get_user_mood_entries for the fast JSON path: plain dicts of the
+    schemas.MoodEntry columns, read without hydrating ORM objects.
+    """
+    result = await db.execute(
+        select(*_schema_columns(models.MoodEntry, schemas.MoodEntry)).where(models.MoodEntry.owner_id == user_id).order_by(models.MoodEntry.timestamp.desc()).offset(skip).limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
 
-def delete_user_mood_entry(db: Session, mood_entry_id: int, user_id: int):
-    db_mood_entry = db.query(models.MoodEntry).filter(models.MoodEntry.id == mood_entry_id, models.MoodEntry.owner_id == user_id).first()
-    if db_mood_entry:
-        db.delete(db_mood_entry)
-        db.commit()
-    return db_mood_entry # Returns deleted object or None
+async def get_user_mood_entries_page(db: AsyncSession, user_id: int, limit: int = 100, before: Optional[str] = None, lean: bool = False):
+    """
+    Keyset-paginated mood history, newest first. With lean=True the page holds plain dicts
+    (see get_user_mood_entry_rows) instead of ORM objects. Raises ValueError for a bad cursor.
+    """
+    columns = _schema_columns(models.MoodEntry, schemas.MoodEntry) if lean else [models.MoodEntry]
+    query = select(*columns).where(models.MoodEntry.owner_id == user_id)
+    return await _keyset_page(db, query, models.MoodEntry, limit, before, lean)
+
+async def get_user_mood_entry(db: AsyncSession, mood_entry_id: int, user_id: int):
+    result = await db.execute(
+        select(models.MoodEntry).where(models.MoodEntry.id == mood_entry_id, models.MoodEntry.owner_id == user_id)
+    )
+    return result.scalars().first()
+
+async def delete_user_mood_entry(db: AsyncSession, mood_entry_id: int, user_id: int):
+    # Delete first and adjust the counters from the returned row, so when two requests delete the
+    # same entry only the one that actually removed it decrements the tag counts and rollup
+    deleted = (await db.execute(
+        delete(models.MoodEntry)
+        .where(models.MoodEntry.id == mood_entry_id, models.MoodEntry.owner_id == user_id)
+        .returning(models.MoodEntry.id, models.MoodEntry.tags, models.MoodEntry.mood_value,
+                   func.date(models.MoodEntry.timestamp).label("day"))
+        .execution_options(synchronize_session=False)
+    )).first()
+    if deleted:
+        await _adjust_mood_tag_counts(db, user_id, deleted.tags, sign=-1)
+        await _adjust_mood_daily_rollup(db, user_id, deleted.day, deleted.mood_value, sign=-1)
+        await _bump_data_version(db, user_id, "mood")
+        await db.commit()
+    return deleted # Returns the deleted row or None
 
 
 # --- NEW CRUD Function for Aggregated Mood Data ---
-def get_mood_trends(db: Session, user_id: int, days: int = 7):
+def _mood_trend_range(days: int) -> Tuple[date, date]:
+    end_date = datetime.now().date() # Current date
+    return end_date - timedelta(days=days - 1), end_date # Go back 'days' from today
+
+def _fill_mood_trends(daily_totals: Dict[str, Tuple[int, int]], start_date: date, days: int) -> List[Dict[str, Any]]:
+    """
+    Turns {'YYYY-MM-DD': (sum, count)} rollup rows into one point per date in the range
+    (0 where there are no entries) so charts get continuous dates.
+    """
+    # Each item will be {'date': 'YYYY-MM-DD', 'average_mood': X.X}
+    trends = []
+    for day in (start_date + timedelta(days=offset) for offset in range(days)):
+        mood_sum, mood_count = daily_totals.get(day.isoformat(), (0, 0))
+        trends.append({"date": day.isoformat(), "average_mood": round(mood_sum / mood_count, 2) if mood_count else 0.0})
+    return trends
+
+@insights_cache.cached("mood_trends")
+async def get_mood_trends(db: AsyncSession, user_id: int, days: int = 7):
     """
     Retrieves aggregated daily average mood over a specified number of days.
+    Reads at most `days` rows from mood_daily_rollup, however many entries the user logged.
     """
-    end_date = datetime.now().date() # Current date
-    start_date = end_date - timedelta(days=days - 1) # Go back 'days' from today
+    start_date, end_date = _mood_trend_range(days)
+    rollup = models.MoodDailyRollup
+    rows = (await db.execute(
+        select(rollup.day, rollup.sum, rollup.count)
+        .where(rollup.owner_id == user_id, rollup.day >= start_date, rollup.day <= end_date)
+    )).all()
+    return _fill_mood_trends({r.day.isoformat(): (r.sum, r.count) for r in rows}, start_date, days)
 
-    # Subquery to truncate timestamp to date and calculate daily average
-    daily_avg_mood = (
-        db.query(
-            func.date_trunc('day', models.MoodEntry.timestamp).label('date'),
-            func.avg(models.MoodEntry.mood_value).label('average_mood')
-        )
-        .filter(
-            models.MoodEntry.owner_id == user_id,
-            # --- MODIFIED LINE HERE ---
-            func.date_trunc('day', models.MoodEntry.timestamp).cast(DATE) >= start_date, # Use imported DATE type
-            # --- END MODIFIED LINE ---
-            func.date_trunc('day', models.MoodEntry.timestamp).cast(DATE) <= end_date  # <-- And here too!
-        )
-        .group_by('date')
-        .order_by('date')
-        .subquery()
-    )
 
-    # Generate a series of dates for the full range (even if no entries)
-    # This ensures your chart has continuous dates
-    date_series = (
-        db.query(
-            func.generate_series(start_date, end_date, '1 day').cast(DATE).label('date') # <-- And here!
-        ).subquery()
-    )
+# --- MODIFIED CRUD for JournalEntry (integrate sentiment analysis) ---
+def _sentiment_fields(sentiment_result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Maps an analysis result (or None when the entry still has to be scored) to JournalEntry columns.
+    """
+    if sentiment_result is None:
+        return {"sentiment_label": None, "sentiment_score": None, "sentiment_status": "pending", "sentiment_source": None}
+    if sentiment_result.get("is_fallback"):
+        # Like a job that ran out of attempts: no label, so the entry isn't counted as Neutral
+        # and a later backfill picks it up again
+        return {"sentiment_label": None, "sentiment_score": None, "sentiment_status": "failed", "sentiment_source": None}
+    return {
+        "sentiment_label": sentiment_result["sentiment_label"],
+        "sentiment_score": sentiment_result["sentiment_score"],
+        "sentiment_status": "done",
+        "sentiment_source": sentiment_result.get("sentiment_source"), # Lets training tell LLM labels from the classifier's own
+    }
 
-    # Left join to include all dates in the range, even those with no mood entries
-    # Coalesce to fill null average_mood with 0 or a default value for frontend charting
-    results = db.query(
-        date_series.c.date,
-        func.coalesce(daily_avg_mood.c.average_mood, 0).label('average_mood') # Use 0 or another default
-    ).outerjoin(
-        daily_avg_mood,
-        date_series.c.date == daily_avg_mood.c.date
-    ).order_by(date_series.c.date).all()
-
-    # Convert results to a list of dictionaries for easier JSON serialization
-    # Each item will be {'date': 'YYYY-MM-DD', 'average_mood': X.X}
-    return [
-        {"date": r.date.isoformat(), "average_mood": round(float(r.average_mood), 2)}
-        for r in results
-    ]
+async def _resolve_sentiment(db: AsyncSession, text: str) -> Optional[Dict[str, Any]]:
+    """
+    With SENTIMENT_ASYNC only a cache hit is used and None defers scoring to the background worker;
+    otherwise the LLM is called inline.
+    """
+    if settings.SENTIMENT_ASYNC:
+        return await sentiment_cache.get(db, content_hash(text))
+    return await sentiment_cache.get_or_analyze(db, text, nlp_service.analyze_sentiment)
 
+async def create_user_journal_entry(db: AsyncSession, journal_entry: schemas.JournalEntryCreate, user_id: int):
+    sentiment_result = await _resolve_sentiment(db, journal_entry.content)
 
-# --- MODIFIED CRUD for JournalEntry (integrate sentiment analysis) ---
-async def create_user_journal_entry(db: Session, journal_entry: schemas.JournalEntryCreate, user_id: int):
-    # Perform sentiment analysis before creating the entry
-    sentiment_result = await nlp_service.analyze_sentiment(journal_entry.content) # <-- CALL NLP SERVICE
-    
     db_journal_entry = models.JournalEntry(
         title=journal_entry.title,
         content=journal_entry.content,
         owner_id=user_id,
-        sentiment_label=sentiment_result["sentiment_label"], # <-- ADD
-        sentiment_score=sentiment_result["sentiment_score"] # <-- ADD
+        **_sentiment_fields(sentiment_result)
     )
     db.add(db_journal_entry)
-    db.commit()
-    db.refresh(db_journal_entry)
+    await db.flush() # Assigns the entry id and stores the server-side timestamp
+    if db_journal_entry.sentiment_status == "pending":
+        await enqueue_sentiment_job(db, db_journal_entry.id)
+    await _extend_journal_streak(db, user_id, db_journal_entry.id)
+    await _bump_data_version(db, user_id, "journal")
+    await db.commit()
+    await db.refresh(db_journal_entry)
     return db_journal_entry
 
-def get_user_journal_entries(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.JournalEntry).filter(models.JournalEntry.owner_id == user_id).order_by(models.JournalEntry.timestamp.desc()).offset(skip).limit(limit).all()
+async def get_user_journal_entries(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(models.JournalEntry).where(models.JournalEntry.owner_id == user_id).order_by(models.JournalEntry.timestamp.desc()).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_user_journal_entry_rows(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Lean variant of get_user_journal_entries for the fast JSON path (see get_user_mood_entry_rows).
+    """
+    result = await db.execute(
+        select(*_schema_columns(models.JournalEntry, schemas.JournalEntry)).where(models.JournalEntry.owner_id == user_id).order_by(models.JournalEntry.timestamp.desc()).offset(skip).limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+async def get_user_journal_entries_page(db: AsyncSession, user_id: int, limit: int = 100, before: Optional[str] = None, lean: bool = False):
+    """
+    Keyset-paginated journal history, newest first (see get_user_mood_entries_page).
+    """
+    columns = _schema_columns(models.JournalEntry, schemas.JournalEntry) if lean else [models.JournalEntry]
+    query = select(*columns).where(models.JournalEntry.owner_id == user_id)
+    return await _keyset_page(db, query, models.JournalEntry, limit, before, lean)
 
-def get_user_journal_entry(db: Session, journal_entry_id: int, user_id: int):
-    return db.query(models.JournalEntry).filter(models.JournalEntry.id == journal_entry_id, models.JournalEntry.owner_id == user_id).first()
+async def get_user_journal_entry(db: AsyncSession, journal_entry_id: int, user_id: int):
+    result = await db.execute(
+        select(models.JournalEntry).where(models.JournalEntry.id == journal_entry_id, models.JournalEntry.owner_id == user_id)
+    )
+    return result.scalars().first()
 
-async def update_user_journal_entry(db: Session, journal_entry_id: int, user_id: int, update_data: Dict[str, Any]):
-    db_journal_entry = db.query(models.JournalEntry).filter(models.JournalEntry.id == journal_entry_id, models.JournalEntry.owner_id == user_id).first()
+async def update_user_journal_entry(db: AsyncSession, journal_entry_id: int, user_id: int, update_data: Dict[str, Any]):
+    db_journal_entry = await get_user_journal_entry(db, journal_entry_id, user_id)
     if db_journal_entry:
-        # If content is being updated, re-run sentiment analysis
+        # If content is being changed, re-run sentiment analysis (unchanged text keeps its score)
         if "content" in update_data:
             updated_content = update_data["content"]
-            sentiment_result = await nlp_service.analyze_sentiment(updated_content) # <-- CALL NLP SERVICE
-            update_data["sentiment_label"] = sentiment_result["sentiment_label"] # <-- ADD
-            update_data["sentiment_score"] = sentiment_result["sentiment_score"] # <-- ADD
+            if updated_content == db_journal_entry.content:
+                metrics.incr("sentiment_cache.unchanged_skip")
+            else:
+                sentiment_result = await _resolve_sentiment(db, updated_content)
+                update_data.update(_sentiment_fields(sentiment_result))
+                if sentiment_result is None:
+                    await enqueue_sentiment_job(db, journal_entry_id)
 
         for key, value in update_data.items():
             setattr(db_journal_entry, key, value)
-        db.commit()
-        db.refresh(db_journal_entry)
+        await _bump_data_version(db, user_id, "journal")
+        await db.commit()
+        await db.refresh(db_journal_entry)
     return db_journal_entry
 
-def delete_user_journal_entry(db: Session, journal_entry_id: int, user_id: int):
-    db_journal_entry = db.query(models.JournalEntry).filter(models.JournalEntry.id == journal_entry_id, models.JournalEntry.owner_id == user_id).first()
+async def delete_user_journal_entry(db: AsyncSession, journal_entry_id: int, user_id: int):
+    db_journal_entry = await get_user_journal_entry(db, journal_entry_id, user_id)
     if db_journal_entry:
-        db.delete(db_journal_entry)
-        db.commit()
+        day = literal((await db.execute(_journal_entry_day(journal_entry_id))).scalar_one(), Date)
+        await db.delete(db_journal_entry)
+        await db.flush()
+        # Range on the (owner_id, timestamp) index; date::timestamptz uses the same session time zone as date()
+        day_still_has_entries = (await db.execute(
+            select(models.JournalEntry.id)
+            .where(
+                models.JournalEntry.owner_id == user_id,
+                models.JournalEntry.timestamp >= day.cast(DateTime(timezone=True)),
+                models.JournalEntry.timestamp < (day + 1).cast(DateTime(timezone=True))
+            )
+            .limit(1)
+        )).first() is not None
+        if not day_still_has_entries:
+            await _recompute_journal_streak(db, user_id) # The day left the streak history, possibly mid-run
+        await _bump_data_version(db, user_id, "journal")
+        await db.commit()
     return db_journal_entry
 
 
-# --- NEW CRUD Function for Journal Streak ---
-def get_journal_streak(db: Session, user_id: int) -> int:
+# --- CRUD for sentiment backfill ---
+async def get_journal_entries_missing_sentiment(db: AsyncSession, limit: int, after_id: int = 0, user_id: Optional[int] = None):
     """
-    Calculates the current consecutive daily journal streak for a user.
-    A streak is maintained if the user has at least one entry for consecutive days
-    up to yesterday, or today if an entry for today exists.
+    Keyset-paginated (by id) entries with no sentiment label that aren't queued for the worker.
     """
-    today = datetime.now().date() # Today's date
-    
-    # Get all distinct dates with journal entries for the user, ordered descending
-    journal_dates = (
-        db.query(func.date(models.JournalEntry.timestamp))
-        .filter(models.JournalEntry.owner_id == user_id)
-        .distinct()
-        .order_by(func.date(models.JournalEntry.timestamp).desc())
-        .all()
+    query = (
+        select(models.JournalEntry.id, models.JournalEntry.content)
+        .where(
+            models.JournalEntry.id > after_id,
+            models.JournalEntry.sentiment_label.is_(None),
+            or_(models.JournalEntry.sentiment_status.is_(None), models.JournalEntry.sentiment_status == "failed")
+        )
+    )
+    if user_id is not None:
+        query = query.where(models.JournalEntry.owner_id == user_id)
+    return (await db.execute(query.order_by(models.JournalEntry.id).limit(limit))).all()
+
+async def queue_missing_sentiment_jobs(db: AsyncSession, user_id: int) -> int:
+    """
+    Hands the user's unscored entries (see get_journal_entries_missing_sentiment) to the background
+    worker: marks them pending and queues a job for each. Returns how many were queued.
+    """
+    entry_ids = (await db.execute(
+        update(models.JournalEntry)
+        .where(
+            models.JournalEntry.owner_id == user_id,
+            models.JournalEntry.sentiment_label.is_(None),
+            or_(models.JournalEntry.sentiment_status.is_(None), models.JournalEntry.sentiment_status == "failed")
+        )
+        .values(sentiment_status="pending")
+        .returning(models.JournalEntry.id)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+    for entry_id in entry_ids:
+        await enqueue_sentiment_job(db, entry_id)
+    if entry_ids:
+        await _bump_data_version(db, user_id, "journal")
+    await db.commit()
+    return len(entry_ids)
+
+async def count_journal_entries_missing_sentiment(db: AsyncSession, user_id: int) -> int:
+    return await db.scalar(
+        select(func.count(models.JournalEntry.id)).where(
+            models.JournalEntry.owner_id == user_id,
+            models.JournalEntry.sentiment_label.is_(None),
+            or_(models.JournalEntry.sentiment_status.is_(None), models.JournalEntry.sentiment_status == "failed")
+        )
+    )
+
+async def apply_sentiment_results(db: AsyncSession, results: Dict[int, Dict[str, Any]]):
+    """
+    Bulk-updates sentiment columns for {journal_entry_id: sentiment_result} in one executemany.
+    """
+    if not results:
+        return
+    await db.execute(
+        update(models.JournalEntry),
+        [{"id": entry_id, **_sentiment_fields(result)} for entry_id, result in results.items()]
     )
+    owner_ids = (await db.execute(
+        select(models.JournalEntry.owner_id).where(models.JournalEntry.id.in_(list(results))).distinct()
+    )).scalars().all()
+    for owner_id in owner_ids:
+        await _bump_data_version(db, owner_id, "journal")
+    await db.commit()
 
-    dates = [d[0] for d in journal_dates] # Extract date objects
 
-    if not dates:
-        return 0 # No journal entries, no streak
+# --- CRUD for SentimentJob (background sentiment queue) ---
+async def enqueue_sentiment_job(db: AsyncSession, journal_entry_id: int):
+    """
+    Queues (or re-queues) sentiment analysis for an entry. Committed with the caller's transaction.
+    """
+    stmt = postgresql.insert(models.SentimentJob).values(journal_entry_id=journal_entry_id, status="pending", attempts=0)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["journal_entry_id"],
+        set_={"status": "pending", "attempts": 0, "last_error": None, "locked_at": None}
+    ))
 
-    current_streak = 0
-    expected_date = today
+async def claim_sentiment_jobs(db: AsyncSession, limit: int, lease_seconds: int) -> List[Dict[str, Any]]:
+    """
+    Atomically leases up to `limit` jobs (pending, or running with an expired lease after a crash).
+    SKIP LOCKED lets several workers poll the same table without blocking each other.
+    """
+    lease_cutoff = func.now() - timedelta(seconds=lease_seconds)
+    claimable = (
+        select(models.SentimentJob.id)
+        .where(or_(
+            models.SentimentJob.status == "pending",
+            and_(models.SentimentJob.status == "running", models.SentimentJob.locked_at < lease_cutoff)
+        ))
+        .order_by(models.SentimentJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = (await db.execute(
+        update(models.SentimentJob)
+        .where(models.SentimentJob.id.in_(claimable))
+        .values(status="running", locked_at=func.now(), attempts=models.SentimentJob.attempts + 1)
+        .returning(models.SentimentJob.id, models.SentimentJob.journal_entry_id, models.SentimentJob.attempts)
+        .execution_options(synchronize_session=False)
+    )).all()
+    if not claimed:
+        await db.commit()
+        return []
+
+    entries = {e.id: e for e in (await db.execute(
+        select(models.JournalEntry.id, models.JournalEntry.owner_id, models.JournalEntry.content)
+        .where(models.JournalEntry.id.in_([c.journal_entry_id for c in claimed]))
+    )).all()}
+    await db.commit()
+    return [
+        {
+            "job_id": c.id, "journal_entry_id": c.journal_entry_id, "attempts": c.attempts,
+            "owner_id": entries[c.journal_entry_id].owner_id, "content": entries[c.journal_entry_id].content
+        }
+        for c in claimed if c.journal_entry_id in entries
+    ]
 
-    # Check if there's an entry for today
-    if dates and dates[0] == today:
-        current_streak = 1
-        expected_date = today - timedelta(days=1)
-    # If no entry for today, check for yesterday's entry to start the streak
-    elif dates and dates[0] == today - timedelta(days=1):
-        current_streak = 1
-        expected_date = today - timedelta(days=2)
+async def complete_sentiment_job(db: AsyncSession, job: Dict[str, Any], sentiment_result: Dict[str, Any]):
+    """
+    Stores the result on the entry and removes the job. The entry is only updated if its content
+    is still the text that was scored, and a job re-queued by a concurrent edit is left in place.
+    """
+    if sentiment_result.get("is_fallback"):
+        await retry_or_fail_sentiment_job(db, job, "LLM sentiment analysis failed")
+        return
+    await db.execute(
+        update(models.JournalEntry)
+        .where(models.JournalEntry.id == job["journal_entry_id"], models.JournalEntry.content == job["content"])
+        .values(**_sentiment_fields(sentiment_result))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(models.SentimentJob)
+        .where(models.SentimentJob.id == job["job_id"], models.SentimentJob.status == "running")
+    )
+    await _bump_data_version(db, job["owner_id"], "journal")
+    await db.commit()
+
+async def retry_or_fail_sentiment_job(db: AsyncSession, job: Dict[str, Any], error: str):
+    if job["attempts"] >= settings.SENTIMENT_JOB_MAX_ATTEMPTS:
+        await db.execute(
+            update(models.JournalEntry)
+            .where(models.JournalEntry.id == job["journal_entry_id"])
+            .values(sentiment_status="failed")
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(models.SentimentJob)
+            .where(models.SentimentJob.id == job["job_id"], models.SentimentJob.status == "running")
+        )
+        await _bump_data_version(db, job["owner_id"], "journal")
     else:
-        return 0 # No entry for today or yesterday, streak is broken
+        await db.execute(
+            update(models.SentimentJob)
+            .where(models.SentimentJob.id == job["job_id"], models.SentimentJob.status == "running")
+            .values(status="pending", locked_at=None, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
 
-    # Iterate through past dates to extend the streak
-    for i in range(1, len(dates)):
-        if dates[i] == expected_date:
-            current_streak += 1
-            expected_date -= timedelta(days=1)
-        else:
-            break # Gap found, streak broken
 
-    return current_streak
+# --- NEW CRUD Function for Journal Streak ---
+def _journal_entry_day(journal_entry_id: int):
+    # date() of a stored entry's timestamp, evaluated in SQL (session time zone) like the streak recompute below
+    return select(func.date(models.JournalEntry.timestamp)).where(models.JournalEntry.id == journal_entry_id)
+
+async def _extend_journal_streak(db: AsyncSession, user_id: int, journal_entry_id: int):
+    """
+    O(1) streak update for a newly flushed entry, in the caller's transaction. New entries are
+    stamped with the server's now(), so their day is never before the stored last_entry_date.
+    """
+    streak = models.JournalStreak
+    stmt = postgresql.insert(streak).values(
+        owner_id=user_id, current_streak=1, longest_streak=1, last_entry_date=_journal_entry_day(journal_entry_id).scalar_subquery()
+    )
+    new_current = case(
+        (streak.last_entry_date >= stmt.excluded.last_entry_date, streak.current_streak), # Same day: unchanged
+        (streak.last_entry_date == stmt.excluded.last_entry_date - 1, streak.current_streak + 1), # Next day: extends the run
+        else_=1 # Gap: a new run starts
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["owner_id"],
+        set_={
+            "current_streak": new_current,
+            "longest_streak": func.greatest(streak.longest_streak, new_current),
+            "last_entry_date": func.greatest(streak.last_entry_date, stmt.excluded.last_entry_date),
+        }
+    ))
+
+async def _recompute_journal_streak(db: AsyncSession, user_id: int) -> Optional[models.JournalStreak]:
+    """
+    Rebuilds a user's streak state from their distinct entry dates (gaps-and-islands: consecutive
+    days share `day - row_number()`). Used after deletes that empty a day and for users without a row yet.
+    """
+    days = (
+        select(func.date(models.JournalEntry.timestamp).label("day"))
+        .where(models.JournalEntry.owner_id == user_id)
+        .distinct()
+        .subquery()
+    )
+    runs = select(days.c.day, (days.c.day - func.row_number().over(order_by=days.c.day).cast(Integer)).label("grp")).subquery()
+    islands = (await db.execute(
+        select(func.count().label("length"), func.max(runs.c.day).label("last_day")).group_by(runs.c.grp)
+    )).all()
+
+    existing = await db.get(models.JournalStreak, user_id)
+    if not islands:
+        if existing is not None:
+            await db.delete(existing)
+        return None
+    latest = max(islands, key=lambda r: r.last_day)
+    state = existing or models.JournalStreak(owner_id=user_id)
+    state.current_streak = latest.length
+    state.longest_streak = max(r.length for r in islands)
+    state.last_entry_date = latest.last_day
+    db.add(state)
+    return state
+
+def _journal_streak_response(current_streak: int, longest_streak: int, last_entry_date: date) -> Dict[str, int]:
+    today = datetime.now().date() # Today's date
+    if last_entry_date < today - timedelta(days=1):
+        current_streak = 0 # No entry for today or yesterday, streak is broken
+    return {"streak": current_streak, "longest_streak": longest_streak}
+
+@insights_cache.cached("journal_streak")
+async def get_journal_streak_state(db: AsyncSession, user_id: int) -> Dict[str, int]:
+    """
+    Current and longest consecutive daily journal streaks, read from the user's journal_streaks row.
+    A streak is maintained if the user has at least one entry for consecutive days
+    up to yesterday, or today if an entry for today exists.
+    """
+    state = await db.get(models.JournalStreak, user_id)
+    if state is None:
+        state = await _recompute_journal_streak(db, user_id) # Lazily initialize rows for users without one
+        await db.commit()
+        if state is None:
+            return {"streak": 0, "longest_streak": 0} # No journal entries, no streak
+
+    return _journal_streak_response(state.current_streak, state.longest_streak, state.last_entry_date)
+
+async def get_journal_streak(db: AsyncSession, user_id: int) -> int:
+    """
+    Calculates the current consecutive daily journal streak for a user.
+    """
+    return (await get_journal_streak_state(db, user_id))["streak"]
 
 
 # --- NEW CRUD Functions for ChatMessage ---
-def create_chat_message(db: Session, user_id: int, content: str, is_user_message: bool):
+async def create_chat_message(db: AsyncSession, user_id: int, content: str, is_user_message: bool):
     db_chat_message = models.ChatMessage(
         owner_id=user_id,
         content=content,
         is_user_message=is_user_message
     )
     db.add(db_chat_message)
-    db.commit()
-    db.refresh(db_chat_message)
+    await _bump_data_version(db, user_id, "chat")
+    await db.commit()
+    await db.refresh(db_chat_message)
     return db_chat_message
 
-def get_user_chat_messages(db: Session, user_id: int, skip: int = 0, limit: int = 20):
+async def get_recent_chat_messages(db: AsyncSession, user_id: int, limit: int = 10) -> List[models.ChatMessage]:
     """
-    Retrieve chat messages for a specific user, ordered by timestamp.
-    `limit` determines how much history is passed to the LLM.
+    The user's latest `limit` messages in chronological order (the context window passed to the LLM).
+    Reads backwards along the (owner_id, timestamp, id) index, so cost is O(limit).
     """
-    return db.query(models.ChatMessage).filter(models.ChatMessage.owner_id == user_id).order_by(models.ChatMessage.timestamp).offset(skip).limit(limit).all()
+    messages = (await db.execute(
+        select(models.ChatMessage)
+        .where(models.ChatMessage.owner_id == user_id)
+        .order_by(models.ChatMessage.timestamp.desc(), models.ChatMessage.id.desc())
+        .limit(limit)
+    )).scalars().all()
+    return list(reversed(messages))
+
+async def get_user_chat_messages_page(db: AsyncSession, user_id: int, limit: int = 50, before: Optional[str] = None) -> Tuple[List[models.ChatMessage], Optional[str]]:
+    """
+    Keyset-paginated chat history, newest page first. Returns the page in chronological order
+    and a cursor for the next (older) page, or None when the history is exhausted.
+    """
+    query = select(models.ChatMessage).where(models.ChatMessage.owner_id == user_id)
+    page, next_cursor = await _keyset_page(db, query, models.ChatMessage, limit, before)
+    return list(reversed(page)), next_cursor
 
 # --- NEW CRUD Function for User Profile Update ---
-def update_user_profile(db: Session, user: models.User, profile_data: schemas.UserProfileUpdate):
+async def update_user_profile(db: AsyncSession, user_id: int, profile_data: schemas.UserProfileUpdate):
+    db_user = await get_user(db, user_id)
+    if db_user is None:
+        return None
     update_data = profile_data.dict(exclude_unset=True) # Only update fields that are provided
     for key, value in update_data.items():
-        setattr(user, key, value)
-    db.add(user) # Or db.merge(user) for detached instances
-    db.commit()
-    db.refresh(user)
-    return user
+        setattr(db_user, key, value)
+    await db.commit()
+    await db.refresh(db_user)
+    principal_cache.invalidate(user_id) # Next request re-reads the updated profile
+    return db_user
 
 # --- MODIFIED CRUD Function: get_most_frequent_mood_tags ---
-def get_most_frequent_mood_tags(db: Session, user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+@insights_cache.cached("mood_tags")
+async def get_most_frequent_mood_tags(db: AsyncSession, user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
     """
-    Retrieves the most frequently used mood tags for a user using LATERAL JOIN.
+    Retrieves the most frequently used mood tags for a user from the mood_tag_counts table,
+    which is kept up to date on mood insert/delete (O(user's distinct tags) per call).
     """
-    # Define a subquery that unnests the tags array using func.unnest()
-    # and associates each unnested tag with the original mood entry's owner_id
-    unnested_tags_subquery = (
-        db.query(
-            models.MoodEntry.owner_id.label('owner_id'),
-            func.unnest(models.MoodEntry.tags).label('tag') # Unnest the tags array
-        )
-        .filter(models.MoodEntry.tags.isnot(None)) # Only consider entries with tags
-        .subquery()
-    )
-
-    # Now, query from the unnested tags subquery, filter by user, group by tag, and count
-    results = (
-        db.query(
-            unnested_tags_subquery.c.tag,
-            func.count(unnested_tags_subquery.c.tag).label('count')
-        )
-        .filter(unnested_tags_subquery.c.owner_id == user_id)
-        .group_by(unnested_tags_subquery.c.tag)
-        .order_by(func.count(unnested_tags_subquery.c.tag).desc())
+    results = (await db.execute(
+        select(models.MoodTagCount.tag, models.MoodTagCount.count)
+        .where(models.MoodTagCount.owner_id == user_id)
+        .order_by(models.MoodTagCount.count.desc(), models.MoodTagCount.tag)
         .limit(limit)
-        .all()
-    )
+    )).all()
     return [{"tag": r.tag, "count": r.count} for r in results]
 
 # --- NEW CRUD Function: Get Daily Mood Averages by Day of Week ---
-def get_average_mood_by_day_of_week(db: Session, user_id: int) -> List[Dict[str, Any]]:
-    """
-    Calculates the average mood for each day of the week (0=Monday, 6=Sunday).
-    """
-    # EXTRACT(DOW FROM timestamp) gives 0=Sunday, 1=Monday...6=Saturday in PostgreSQL.
-    # We want 0=Monday, so we adjust: (EXTRACT(DOW FROM timestamp) + 6) % 7
-    results = (
-        db.query(
-            ((func.extract('dow', models.MoodEntry.timestamp) + 6) % 7).label('day_of_week_num'), # 0=Mon, 1=Tue...6=Sun
-            func.avg(models.MoodEntry.mood_value).label('average_mood')
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _mood_by_day_of_week_query(user_id: int):
+    rollup = models.MoodDailyRollup
+    # EXTRACT(DOW FROM day) gives 0=Sunday, 1=Monday...6=Saturday in PostgreSQL.
+    # We want 0=Monday, so we adjust: (EXTRACT(DOW FROM day) + 6) % 7
+    return (
+        select(
+            ((func.extract('dow', rollup.day) + 6) % 7).label('day_of_week_num'), # 0=Mon, 1=Tue...6=Sun
+            func.sum(rollup.sum).label('mood_sum'),
+            func.sum(rollup.count).label('mood_count')
         )
-        .filter(models.MoodEntry.owner_id == user_id)
+        .where(rollup.owner_id == user_id)
         .group_by('day_of_week_num')
-        .order_by('day_of_week_num')
-        .all()
     )
+
+def _format_mood_by_day_of_week(rows) -> List[Dict[str, Any]]:
+    # Weighted by entry count, so each day equals the average over raw entries
     # Map numerical day of week to names for easier display
-    day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     return [
-        {"day": day_names[int(r.day_of_week_num)], "average_mood": round(float(r.average_mood), 2)}
-        for r in results
+        {"day": DAY_NAMES[int(r["day_of_week_num"])], "average_mood": round(float(r["mood_sum"]) / float(r["mood_count"]), 2)}
+        for r in sorted(rows, key=lambda r: r["day_of_week_num"])
+        if r["mood_count"]
     ]
 
-# --- NEW CRUD Function: Get Journal Sentiment Summary (Basic) ---
-def get_journal_sentiment_summary(db: Session, user_id: int) -> Dict[str, Any]:
+@insights_cache.cached("mood_avg_by_day")
+async def get_average_mood_by_day_of_week(db: AsyncSession, user_id: int) -> List[Dict[str, Any]]:
     """
-    Provides a basic summary of journal sentiment distribution.
+    Calculates the average mood for each day of the week (0=Monday, 6=Sunday) from mood_daily_rollup.
     """
-    total_entries = db.query(models.JournalEntry).filter(models.JournalEntry.owner_id == user_id).count()
+    results = (await db.execute(_mood_by_day_of_week_query(user_id))).mappings().all()
+    return _format_mood_by_day_of_week(results)
+
+# --- NEW CRUD Function: Get Journal Sentiment Summary (Basic) ---
+SENTIMENT_SUMMARY_LABELS = {"positive": "Positive", "negative": "Negative", "neutral": "Neutral"}
+
+def _sentiment_count_columns() -> Dict[str, Any]:
+    # count(*) FILTER (WHERE ...) per label, so the total and distribution come from one scan
+    columns = {"total": func.count()}
+    for key, label in SENTIMENT_SUMMARY_LABELS.items():
+        columns[key] = func.count().filter(models.JournalEntry.sentiment_label == label)
+    return columns
+
+def _format_sentiment_summary(counts: Dict[str, int]) -> Dict[str, Any]:
+    total_entries = counts["total"]
     if total_entries == 0:
         return {
             "total_entries": 0,
@@ -297,17 +751,9 @@ def get_journal_sentiment_summary(db: Session, user_id: int) -> Dict[str, Any]:
             "most_common_sentiment": "N/A"
         }
 
-    sentiment_counts = (
-        db.query(models.JournalEntry.sentiment_label, func.count(models.JournalEntry.sentiment_label))
-        .filter(models.JournalEntry.owner_id == user_id)
-        .group_by(models.JournalEntry.sentiment_label)
-        .all()
-    )
-
-    counts = {label: count for label, count in sentiment_counts}
-    pos_count = counts.get("Positive", 0)
-    neg_count = counts.get("Negative", 0)
-    neu_count = counts.get("Neutral", 0)
+    pos_count = counts["positive"]
+    neg_count = counts["negative"]
+    neu_count = counts["neutral"]
 
     pos_pct = round((pos_count / total_entries) * 100, 2)
     neg_pct = round((neg_count / total_entries) * 100, 2)
@@ -327,4 +773,91 @@ def get_journal_sentiment_summary(db: Session, user_id: int) -> Dict[str, Any]:
         "negative_percentage": neg_pct,
         "neutral_percentage": neu_pct,
         "most_common_sentiment": most_common
-    }
\ No newline at end of file
+    }
+
+@insights_cache.cached("sentiment_summary")
+async def get_journal_sentiment_summary(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+    """
+    Provides a basic summary of journal sentiment distribution (a single aggregate query).
+    """
+    counts = (await db.execute(
+        select(*(column.label(name) for name, column in _sentiment_count_columns().items()))
+        .where(models.JournalEntry.owner_id == user_id)
+    )).mappings().one()
+    return _format_sentiment_summary(counts)
+
+# --- Insights dashboard (all sections in one round-trip) ---
+DASHBOARD_SECTIONS = ("mood_tags", "mood_avg_by_day", "sentiment_summary", "mood_trends", "journal_streak")
+
+def _json_object(columns: Dict[str, Any]):
+    # Keys are inlined as SQL literals: asyncpg can't infer a type for bound parameters of json_build_object
+    return func.json_build_object(*(arg for name, column in columns.items() for arg in (literal_column(f"'{name}'"), column)))
+
+def _json_rows(query) -> Any:
+    # One JSON array (NULL when empty) holding every row of `query` as an object keyed by column name
+    rows = query.subquery()
+    return select(func.json_agg(_json_object({c.name: c for c in rows.c}))).scalar_subquery()
+
+@insights_cache.cached("dashboard")
+async def get_insights_dashboard(
+    db: AsyncSession, user_id: int, sections=DASHBOARD_SECTIONS, tag_limit: int = 5, trend_days: int = 7
+) -> Dict[str, Any]:
+    """
+    Dashboard insights in a single SELECT: each requested section is a scalar subquery that returns
+    JSON, so the database is hit once no matter how many sections are asked for. Each section has
+    the same shape as its standalone endpoint.
+    """
+    columns = {}
+    if "mood_tags" in sections:
+        columns["mood_tags"] = _json_rows(
+            select(models.MoodTagCount.tag, models.MoodTagCount.count)
+            .where(models.MoodTagCount.owner_id == user_id)
+            .order_by(models.MoodTagCount.count.desc(), models.MoodTagCount.tag)
+            .limit(tag_limit)
+        )
+    if "mood_avg_by_day" in sections:
+        columns["mood_avg_by_day"] = _json_rows(_mood_by_day_of_week_query(user_id))
+    if "sentiment_summary" in sections:
+        columns["sentiment_summary"] = (
+            select(_json_object(_sentiment_count_columns()))
+            .where(models.JournalEntry.owner_id == user_id)
+            .scalar_subquery()
+        )
+    if "mood_trends" in sections:
+        start_date, end_date = _mood_trend_range(trend_days)
+        rollup = models.MoodDailyRollup
+        columns["mood_trends"] = _json_rows(
+            select(rollup.day, rollup.sum, rollup.count)
+            .where(rollup.owner_id == user_id, rollup.day >= start_date, rollup.day <= end_date)
+        )
+    if "journal_streak" in sections:
+        columns["journal_streak"] = _json_rows(
+            select(models.JournalStreak.current_streak, models.JournalStreak.longest_streak, models.JournalStreak.last_entry_date)
+            .where(models.JournalStreak.owner_id == user_id)
+        )
+    if not columns:
+        return {}
+
+    row = (await db.execute(select(*(column.label(name) for name, column in columns.items())))).mappings().one()
+
+    dashboard = {}
+    if "mood_tags" in columns:
+        tags = sorted(row["mood_tags"] or [], key=lambda r: (-r["count"], r["tag"])) # json_agg order isn't guaranteed
+        dashboard["mood_tags"] = [{"tag": r["tag"], "count": r["count"]} for r in tags]
+    if "mood_avg_by_day" in columns:
+        dashboard["mood_avg_by_day"] = _format_mood_by_day_of_week(row["mood_avg_by_day"] or [])
+    if "sentiment_summary" in columns:
+        dashboard["sentiment_summary"] = _format_sentiment_summary(row["sentiment_summary"])
+    if "mood_trends" in columns:
+        daily_totals = {r["day"]: (r["sum"], r["count"]) for r in row["mood_trends"] or []}
+        dashboard["mood_trends"] = _fill_mood_trends(daily_totals, start_date, trend_days)
+    if "journal_streak" in columns:
+        streak_rows = row["journal_streak"] or []
+        if streak_rows:
+            state = streak_rows[0]
+            dashboard["journal_streak"] = _journal_streak_response(
+                state["current_streak"], state["longest_streak"], date.fromisoformat(state["last_entry_date"])
+            )
+        else:
+            dashboard["journal_streak"] = {"streak": 0, "longest_streak": 0} # Rows exist for every user with entries (see the migration)
+    return dashboard
@@ -1,18 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from .config import settings
 from .database import engine, Base # Import engine and Base for table creation (for initial dev)
+from .responses import FastJSONResponse
 from .auth import routes as auth_routes # Import auth routes
-from .api import mood, journal, chat, user_profile, insights # <-- ADDED: Import insights router
+from .api import mood, journal, chat, user_profile, insights, health, export # <-- ADDED: Import insights router
+from .services.nlp_service import nlp_service_instance
+from .services.rag_service import chatbot_service_instance
+from .services.sentiment_worker import sentiment_worker
 
 # Create all database tables (for development, Alembic handles this in production)
 # This will try to create tables if they don't exist based on your models.
 # In a real production setup, Alembic migrations are preferred.
 # Base.metadata.create_all(bind=engine) # Comment this out once you're confident with Alembic
 
+async def warm_up_services():
+    """
+    Loads the NLP and RAG components off the event loop so the worker accepts
+    connections immediately. Failures are recorded on the service (see /health/ready)
+    and initialization is retried on the next request that needs it.
+    """
+    for service in (nlp_service_instance, chatbot_service_instance):
+        try:
+            await service.ensure_ready()
+        except Exception as e:
+            print(f"Warning: {type(service).__name__} warm-up failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = None
+    if settings.WARM_SERVICES_ON_STARTUP:
+        warmup_task = asyncio.create_task(warm_up_services())
+    if settings.SENTIMENT_ASYNC:
+        sentiment_worker.start()
+    yield
+    await sentiment_worker.stop()
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await engine.dispose() # Close pooled asyncpg connections
+
 app = FastAPI(
     title="Mental Health & Self-Help Assistant API",
     description="Backend API for the Mental Health & Self-Help Assistant.",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.FAST_JSON_RESPONSES else JSONResponse,
 )
 
 # Configure CORS (Cross-Origin Resource Sharing)
@@ -30,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"], # Allow all HTTP methods (GET, POST, PUT, DELETE, etc.)
     allow_headers=["*"], # Allow all headers
+    expose_headers=["X-Next-Cursor", "ETag"], # Let the frontend read pagination cursors and validators
 )
 
 # Include your API routers
@@ -39,6 +76,8 @@ app.include_router(journal.router) # <-- ADDED
 app.include_router(chat.router)    # <-- ADDED
 app.include_router(user_profile.router) # <-- ADDED: Include user_profile router
 app.include_router(insights.router) # <-- ADDED: Include insights router
+app.include_router(health.router)
+app.include_router(export.router)
 
 @app.get("/")
 def read_root():
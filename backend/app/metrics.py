@@ -0,0 +1,26 @@
+import threading
+from collections import Counter
+from typing import Dict
+
+# Simple process-local counters (cache hits/misses, lookups...) exposed via GET /health/metrics
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+def incr(name: str, amount: int = 1):
+    with _lock:
+        _counters[name] += amount
+
+def snapshot() -> Dict[str, int]:
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+def hit_rates() -> Dict[str, float]:
+    """`<prefix>.hit_rate` for every counter pair named `<prefix>.hit` / `<prefix>.miss`."""
+    counters = snapshot()
+    rates = {}
+    for name, hits in counters.items():
+        if name.endswith(".hit"):
+            prefix = name[:-len(".hit")]
+            total = hits + counters.get(f"{prefix}.miss", 0)
+            rates[f"{prefix}.hit_rate"] = round(hits / total, 4) if total else 0.0
+    return rates
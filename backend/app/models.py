@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, Boolean, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, Date, DateTime, func, Boolean, ForeignKey, Text, Float, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import relationship
 # --- NEW IMPORT for PostgreSQL Array type ---
 from sqlalchemy.dialects.postgresql import ARRAY # <-- ADD THIS IMPORT
@@ -42,6 +42,11 @@ class MoodEntry(Base):
 
     owner = relationship("User", back_populates="mood_entries")
 
+    __table_args__ = (
+        # Per-user time-range scans (history pages, export)
+        Index("ix_mood_entries_owner_id_timestamp_id", "owner_id", "timestamp", "id"),
+    )
+
 
 # --- MODIFIED MODEL: JournalEntry (add sentiment fields) ---
 class JournalEntry(Base):
@@ -55,9 +60,15 @@ class JournalEntry(Base):
 
     sentiment_label = Column(String, nullable=True) # e.g., 'Positive', 'Negative', 'Neutral'
     sentiment_score = Column(Float, nullable=True) # e.g., 0.85 for positive, -0.6 for negative
+    sentiment_status = Column(String, nullable=True) # 'pending' while queued for analysis, then 'done' or 'failed'
+    sentiment_source = Column(String, nullable=True) # 'llm' or 'local' (the trained classifier) once scored
 
     owner = relationship("User", back_populates="journal_entries")
 
+    __table_args__ = (
+        Index("ix_journal_entries_owner_id_timestamp_id", "owner_id", "timestamp", "id"),
+    )
+
 
 class Goal(Base):
     __tablename__ = "goals"
@@ -80,4 +91,76 @@ class ChatMessage(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     is_user_message = Column(Boolean, nullable=False) # True if from user, False if from AI
 
-    owner = relationship("User", back_populates="chat_messages")
\ No newline at end of file
+    owner = relationship("User", back_populates="chat_messages")
+
+    __table_args__ = (
+        # Keyset pagination / "latest N turns" for a user
+        Index("ix_chat_messages_owner_id_timestamp_id", "owner_id", "timestamp", "id"),
+    )
+
+# --- NEW MODEL: SentimentCacheEntry (optional persistent sentiment cache) ---
+class SentimentCacheEntry(Base):
+    __tablename__ = "sentiment_cache"
+
+    content_hash = Column(String(64), primary_key=True) # sha256 of provider/model + text
+    sentiment_label = Column(String, nullable=False)
+    sentiment_score = Column(Float, nullable=False)
+    sentiment_source = Column(String, nullable=True) # 'llm' or 'local', as on journal_entries
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# --- NEW MODEL: SentimentJob (DB-backed queue for background sentiment analysis) ---
+class SentimentJob(Base):
+    __tablename__ = "sentiment_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    journal_entry_id = Column(Integer, ForeignKey("journal_entries.id", ondelete="CASCADE"), unique=True, nullable=False)
+    status = Column(String, nullable=False, default="pending", index=True) # 'pending' or 'running'
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True) # Lease start; stale leases are reclaimed after a crash
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# --- NEW MODEL: MoodTagCount (per-user tag usage, maintained on mood insert/delete) ---
+class MoodTagCount(Base):
+    __tablename__ = "mood_tag_counts"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    tag = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("owner_id", "tag"),
+    )
+
+# --- NEW MODEL: MoodDailyRollup (per-user daily mood sum/count, maintained on mood insert/delete) ---
+class MoodDailyRollup(Base):
+    __tablename__ = "mood_daily_rollup"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False) # date(mood_entries.timestamp) in the database session time zone
+    sum = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("owner_id", "day"),
+    )
+
+# --- NEW MODEL: JournalStreak (per-user streak state, maintained on journal create/delete) ---
+class JournalStreak(Base):
+    __tablename__ = "journal_streaks"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    current_streak = Column(Integer, nullable=False, default=0) # Length of the run of consecutive days ending at last_entry_date
+    longest_streak = Column(Integer, nullable=False, default=0)
+    last_entry_date = Column(Date, nullable=False)
+
+# --- NEW MODEL: UserDataVersion (per-user write counters, used for HTTP ETags) ---
+class UserDataVersion(Base):
+    __tablename__ = "user_data_versions"
+
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    mood_version = Column(Integer, nullable=False, default=0, server_default="0")
+    journal_version = Column(Integer, nullable=False, default=0, server_default="0")
+    chat_version = Column(Integer, nullable=False, default=0, server_default="0")
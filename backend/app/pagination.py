@@ -0,0 +1,23 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+# Opaque keyset cursors: a (timestamp, id) position in a user's time-ordered history.
+# Rows are read with `(timestamp, id) < cursor` against an (owner_id, timestamp, id) index,
+# so every page costs O(page size) regardless of how deep the client has scrolled.
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Raises ValueError for malformed cursors.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp_str, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(timestamp_str), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,22 @@
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+# Opt-in fast JSON path (FAST_JSON_RESPONSES). List endpoints build plain dicts from
+# column-selected rows and hand them straight to orjson, skipping ORM hydration,
+# response_model validation and the stdlib encoder.
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-encoded response. UTC datetimes are written with a 'Z' suffix like Pydantic's JSON
+    mode, so payloads are identical whichever response class produced them.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z)
+
+def fast_json_response(content: Any, response: Response) -> FastJSONResponse:
+    # Returning a Response bypasses the injected one, so carry over headers set on it (ETag, cursors)
+    return FastJSONResponse(content, headers=dict(response.headers))
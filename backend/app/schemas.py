@@ -74,6 +74,7 @@ class JournalEntry(BaseModel):
     owner_id: int
     sentiment_label: Optional[str] = None # <-- ADD THIS
     sentiment_score: Optional[float] = None # <-- ADD THIS
+    sentiment_status: Optional[str] = None # 'pending' until the background worker has scored the entry
 
     model_config = {"from_attributes": True}
 
@@ -0,0 +1,142 @@
+# backend/app/services/embeddings.py
+
+import json
+import threading
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from ..config import settings
+
+SUPPORTED_BACKENDS = ("torch", "onnx")
+# ONNX exports shipped in the sentence-transformers model repos
+ONNX_MODEL_FILE = "onnx/model.onnx"
+ONNX_INT8_MODEL_FILE = "onnx/model_quint8_avx2.onnx" # Dynamic int8 quantization; runs on any AVX2 CPU
+
+_embeddings = None
+_lock = threading.Lock()
+
+
+def _hub_repo_id(model_name: str) -> str:
+    # Same shorthand sentence-transformers accepts: bare names live under sentence-transformers/
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxSentenceEmbeddings(Embeddings):
+    """
+    Runs a sentence-transformers model with onnxruntime instead of torch: tokenizes with the
+    model's fast tokenizer, then applies the model's own pooling and normalization steps in numpy,
+    so vectors match the torch path (to within int8 rounding when quantized).
+    """
+
+    def __init__(self, model_name: str, quantized: bool = False, batch_size: int = 32, threads: int = 0):
+        # Deferred imports: only needed when EMBEDDING_BACKEND=onnx
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        repo_id = _hub_repo_id(model_name)
+
+        def read_json(filename: str, default=None):
+            try:
+                with open(hf_hub_download(repo_id, filename), encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                if default is None:
+                    raise
+                return default
+
+        modules = read_json("modules.json", default=[])
+        self.normalize = any(m.get("type", "").endswith("Normalize") for m in modules)
+        pooling = read_json("1_Pooling/config.json", default={"pooling_mode_mean_tokens": True})
+        self.cls_pooling = bool(pooling.get("pooling_mode_cls_token"))
+        max_seq_length = read_json("sentence_bert_config.json", default={}).get("max_seq_length", 256)
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo_id, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        model_file = ONNX_INT8_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        self.session = ort.InferenceSession(hf_hub_download(repo_id, model_file), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+
+    def _embed_batch(self, texts: List[str]):
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        if self.cls_pooling:
+            pooled = token_embeddings[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Batch texts of similar length together so little of each batch is padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0].tolist()
+
+
+def create_embeddings(backend: str, quantized: bool = False, batch_size: int = 32, threads: int = 0) -> Embeddings:
+    """Builds an embedding engine for EMBEDDING_MODEL_NAME; used by get_embeddings and the embedding benchmark."""
+    if backend == "onnx":
+        return OnnxSentenceEmbeddings(settings.EMBEDDING_MODEL_NAME, quantized=quantized, batch_size=batch_size, threads=threads)
+    if backend == "torch":
+        if quantized:
+            raise ValueError("EMBEDDING_ONNX_INT8 requires EMBEDDING_BACKEND=onnx.")
+        # Deferred import: loading sentence-transformers/torch takes seconds
+        from langchain_community.embeddings import SentenceTransformerEmbeddings
+        if threads > 0:
+            import torch
+            torch.set_num_threads(threads)
+        return SentenceTransformerEmbeddings(model_name=settings.EMBEDDING_MODEL_NAME, encode_kwargs={"batch_size": batch_size})
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}'. Expected one of: {', '.join(SUPPORTED_BACKENDS)}.")
+
+
+def embedding_model_id() -> str:
+    """
+    Identifies the vectors the configured engine produces. torch and fp32 ONNX agree, so only
+    int8 quantization makes stored vectors incompatible.
+    """
+    if settings.EMBEDDING_BACKEND == "onnx" and settings.EMBEDDING_ONNX_INT8:
+        return f"{settings.EMBEDDING_MODEL_NAME} (int8)"
+    return settings.EMBEDDING_MODEL_NAME
+
+
+def get_embeddings():
+    """
+    Returns the process-wide sentence embedding model shared by the RAG retriever
+    and the local sentiment classifier, loading it on first use.
+    """
+    global _embeddings
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                _embeddings = create_embeddings(
+                    settings.EMBEDDING_BACKEND, quantized=settings.EMBEDDING_ONNX_INT8,
+                    batch_size=settings.EMBEDDING_BATCH_SIZE, threads=settings.EMBEDDING_THREADS,
+                )
+                print(f"Embeddings model loaded: {embedding_model_id()} ({settings.EMBEDDING_BACKEND})")
+    return _embeddings
@@ -0,0 +1,132 @@
+# backend/app/services/insights_cache.py
+
+import functools
+import json
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cachetools import TTLCache
+
+from .. import metrics
+from ..config import settings
+
+SUPPORTED_BACKENDS = ("memory", "redis", "none")
+
+
+class MemoryCacheBackend:
+    """Process-local TTL + LRU store. Entries are only shared by requests handled in this process."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._entries.get(key)
+
+    async def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+
+
+class RedisCacheBackend:
+    """
+    Any client with the redis.asyncio get/set API (redis-py, or a fake in tests). Values are stored as
+    JSON with the cache TTL, so every API worker shares entries.
+    """
+
+    def __init__(self, client: Any, ttl: int):
+        self._client = client
+        self._ttl = ttl
+
+    @classmethod
+    def from_url(cls, url: str, ttl: int) -> "RedisCacheBackend":
+        try:
+            # Imported here so the in-process backend works without the Redis client installed
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("INSIGHTS_CACHE_BACKEND=redis requires the 'redis' package (pip install redis).") from e
+        return cls(redis.from_url(url), ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any):
+        await self._client.set(key, json.dumps(value), ex=self._ttl)
+
+
+class InsightsCache:
+    """
+    Per-user cache of insight/trend results. Keys embed the user's mood and journal data versions
+    (user_data_versions, the counters behind the ETags), which every write bumps in its own
+    transaction, so all workers agree on what is current: stale entries are never read and simply
+    age out. crud.get_data_versions memoizes the read on the session, so an endpoint that already
+    checked its ETag doesn't pay another query for the lookup.
+    """
+
+    def __init__(self, backend: Optional[Any], versions: Optional[Callable[[Any, int], Awaitable[Dict[str, int]]]] = None):
+        self.backend = backend
+        self.versions = versions
+
+    def set_backend(self, backend: Optional[Any]):
+        """Swaps the store (e.g. a fake Redis in tests); None disables caching."""
+        self.backend = backend
+
+    def set_versions(self, versions: Callable[[Any, int], Awaitable[Dict[str, int]]]):
+        """Sets `async versions(db, user_id)`, which returns the user's data versions (crud.get_data_versions)."""
+        self.versions = versions
+
+    async def _version(self, db, user_id: int) -> str:
+        versions = await self.versions(db, user_id)
+        return f"m{versions['mood']}j{versions['journal']}" # Insights only read mood and journal data
+
+    def cached(self, name: str):
+        """
+        Decorates an `async def f(db, user_id, ...)` crud function. Extra arguments and today's date
+        (trends and streaks are relative to it) are part of the key.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(db, user_id, *args, **kwargs):
+                if self.backend is None or self.versions is None:
+                    return await func(db, user_id, *args, **kwargs)
+                params = json.dumps([args, kwargs, datetime.now().date()], sort_keys=True, default=str)
+                try:
+                    key = f"insights:{user_id}:{await self._version(db, user_id)}:{name}:{params}"
+                    cached = await self.backend.get(key)
+                except Exception as e:
+                    metrics.incr("insights_cache.error")
+                    print(f"Warning: insights cache read failed: {e}")
+                    return await func(db, user_id, *args, **kwargs)
+                if cached is not None:
+                    metrics.incr("insights_cache.hit")
+                    return cached
+
+                metrics.incr("insights_cache.miss")
+                result = await func(db, user_id, *args, **kwargs)
+                try:
+                    await self.backend.set(key, result)
+                except Exception as e:
+                    metrics.incr("insights_cache.error")
+                    print(f"Warning: insights cache write failed: {e}")
+                return result
+            return wrapper
+        return decorator
+
+
+def _create_backend():
+    backend = settings.INSIGHTS_CACHE_BACKEND
+    if settings.INSIGHTS_CACHE_TTL_SECONDS <= 0:
+        return None # A zero TTL disables caching (Redis rejects ex=0)
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize=settings.INSIGHTS_CACHE_SIZE, ttl=settings.INSIGHTS_CACHE_TTL_SECONDS)
+    if backend == "redis":
+        return RedisCacheBackend.from_url(settings.INSIGHTS_CACHE_REDIS_URL, ttl=settings.INSIGHTS_CACHE_TTL_SECONDS)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown INSIGHTS_CACHE_BACKEND '{backend}'. Expected one of: {', '.join(SUPPORTED_BACKENDS)}.")
+
+
+insights_cache = InsightsCache(_create_backend())
@@ -0,0 +1,50 @@
+# backend/app/services/lazy.py
+
+import asyncio
+import threading
+
+
+class LazyService:
+    """
+    Base class for singleton services whose heavy components (models, vector stores, LLM clients)
+    are loaded on first use or by the startup warm-up task, never at import time.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(LazyService, cls).__new__(cls)
+            cls._instance._init_lock = threading.Lock()
+            cls._instance.status = "not_started" # not_started | initializing | ready | failed
+            cls._instance.init_error = None
+        return cls._instance
+
+    def _initialize(self):
+        raise NotImplementedError
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+    def ensure_ready_sync(self):
+        """Blocking initialization, safe to call from several threads at once."""
+        if self.is_ready:
+            return self
+        with self._init_lock:
+            if not self.is_ready:
+                self.status = "initializing"
+                try:
+                    self._initialize()
+                except Exception as e:
+                    self.status = "failed"
+                    self.init_error = str(e)
+                    raise
+                self.status = "ready"
+                self.init_error = None
+        return self
+
+    async def ensure_ready(self):
+        """Initializes the service in a worker thread so the event loop keeps serving requests."""
+        if not self.is_ready:
+            await asyncio.to_thread(self.ensure_ready_sync)
+        return self
@@ -0,0 +1,132 @@
+# backend/app/services/llm_provider.py
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from ..config import settings
+
+SUPPORTED_PROVIDERS = ("gemini", "fake")
+
+# Tiny lexicon used by the fake provider to produce stable, plausible sentiment labels
+_POSITIVE_WORDS = {
+    "good", "great", "happy", "calm", "grateful", "love", "excited", "proud", "relaxed",
+    "better", "hopeful", "joy", "peaceful", "fun", "enjoyed", "wonderful", "thankful",
+}
+_NEGATIVE_WORDS = {
+    "bad", "sad", "angry", "anxious", "stressed", "tired", "lonely", "worried", "afraid",
+    "depressed", "upset", "awful", "terrible", "hate", "overwhelmed", "cry", "hurt",
+}
+
+
+def _lexicon_sentiment(text: str) -> dict:
+    words = re.findall(r"[a-z']+", text.lower())
+    pos = sum(1 for w in words if w in _POSITIVE_WORDS)
+    neg = sum(1 for w in words if w in _NEGATIVE_WORDS)
+    score = round((pos - neg) / max(pos + neg, 1), 2)
+    if score > 0.2:
+        label = "Positive"
+    elif score < -0.2:
+        label = "Negative"
+    else:
+        label = "Neutral"
+    return {"sentiment_label": label, "sentiment_score": score}
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline, deterministic chat model used when LLM_PROVIDER=fake.
+    Echoes the last human message (or returns lexicon-based sentiment JSON for single/batch sentiment prompts)
+    after an optional simulated latency, so the full app can be load-tested without Gemini.
+    """
+    latency_ms: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-echo"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        system_text = " ".join(m.content for m in messages if isinstance(m, SystemMessage))
+        human_messages = [m for m in messages if isinstance(m, HumanMessage)]
+        last_human = human_messages[-1].content if human_messages else ""
+
+        if "sentiment_label" in system_text and "JSON array" in system_text:
+            entries = json.loads(last_human.split(":", 1)[-1])
+            return json.dumps([{"index": e["index"], **_lexicon_sentiment(e["text"])} for e in entries])
+        if "sentiment_label" in system_text:
+            text = last_human.split(":", 1)[-1]
+            return json.dumps(_lexicon_sentiment(text))
+
+        return f"(offline assistant) You said: {last_human.strip()[:500]}"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._respond(messages)))])
+
+    def _chunks(self, messages: List[BaseMessage]) -> List[str]:
+        # Word-sized chunks so streaming clients see several tokens
+        return re.findall(r"\S+\s*", self._respond(messages))
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages)
+        for chunk in chunks:
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000 / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(messages)
+        for chunk in chunks:
+            if self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000 / len(chunks))
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+
+_llm_instance: Optional[BaseChatModel] = None
+
+
+def _create_gemini_llm() -> BaseChatModel:
+    if not settings.GOOGLE_API_KEY:
+        raise ValueError("GOOGLE_API_KEY environment variable not set. Please get an API key from Google AI Studio or set LLM_PROVIDER=fake.")
+    # Imported here so the fake provider works without the Gemini client installed
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    llm = ChatGoogleGenerativeAI(model=settings.GEMINI_MODEL_NAME, google_api_key=settings.GOOGLE_API_KEY)
+    if settings.LLM_STARTUP_PROBE:
+        try:
+            llm.invoke("Hello, are you there?")
+        except Exception as e:
+            print(f"Error: Gemini LLM not reachable or configuration issue. Details: {e}")
+            raise ConnectionError(f"Gemini connection error: {e}")
+    return llm
+
+
+def get_llm() -> BaseChatModel:
+    """
+    Returns the process-wide chat model for the configured LLM_PROVIDER.
+    No network call is made unless LLM_STARTUP_PROBE is enabled.
+    """
+    global _llm_instance
+    if _llm_instance is None:
+        provider = settings.LLM_PROVIDER
+        if provider == "gemini":
+            _llm_instance = _create_gemini_llm()
+            print(f"LLM provider initialized: Gemini ({settings.GEMINI_MODEL_NAME})")
+        elif provider == "fake":
+            _llm_instance = FakeChatModel(latency_ms=settings.FAKE_LLM_LATENCY_MS)
+            print(f"LLM provider initialized: fake (latency {settings.FAKE_LLM_LATENCY_MS}ms)")
+        else:
+            raise ValueError(f"Unknown LLM_PROVIDER '{provider}'. Expected one of: {', '.join(SUPPORTED_PROVIDERS)}.")
+    return _llm_instance
@@ -1,44 +1,93 @@
 # backend/app/services/nlp_service.py
 
-import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional
 import json
 
-# Load environment variables for GOOGLE_API_KEY if not already loaded by FastAPI main
-load_dotenv()
-
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GEMINI_MODEL_NAME = "gemini-2.0-flash" # Use the same model as chatbot service
-
-class NLPService:
+from .lazy import LazyService
+from .llm_provider import get_llm
+from .sentiment_classifier import local_sentiment_classifier
+from .. import metrics
+from ..config import settings
+
+def fallback_sentiment() -> Dict[str, Any]:
+    """
+    Neutral result used when the LLM call or its parsing fails.
+    Flagged so callers (e.g. the sentiment cache) don't persist it as a real score.
+    """
+    return {"sentiment_label": "Neutral", "sentiment_score": 0.0, "is_fallback": True}
+
+
+def _extract_json_str(raw_response_content: str) -> str:
+    """
+    Strips the markdown code fences Gemini sometimes wraps around JSON output.
+    """
+    if raw_response_content.strip().startswith("```json"):
+        json_start = raw_response_content.find("```json") + 7
+        json_end = raw_response_content.find("```", json_start)
+        if json_end != -1:
+            json_str = raw_response_content[json_start:json_end].strip()
+            print(f"DEBUG: Extracted JSON from markdown: '{json_str}'")
+        else:
+            json_str = raw_response_content[json_start:].strip()
+            print(f"DEBUG: Extracted JSON from markdown (no end): '{json_str}'")
+    elif raw_response_content.strip().startswith("```"):
+        # Generic code block
+        json_start = raw_response_content.find("```") + 3
+        json_end = raw_response_content.find("```", json_start)
+        if json_end != -1:
+            json_str = raw_response_content[json_start:json_end].strip()
+            print(f"DEBUG: Extracted JSON from generic code block: '{json_str}'")
+        else:
+            json_str = raw_response_content[json_start:].strip()
+            print(f"DEBUG: Extracted JSON from generic code block (no end): '{json_str}'")
+    else:
+        json_str = raw_response_content.strip()
+    return json_str
+
+
+def _parse_sentiment(sentiment_data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Validates one {"sentiment_label", "sentiment_score"} object from the LLM; returns None if malformed.
+    """
+    if not isinstance(sentiment_data, dict):
+        return None
+    label = sentiment_data.get("sentiment_label")
+    score = sentiment_data.get("sentiment_score")
+    if label in ["Positive", "Negative", "Neutral"] and isinstance(score, (int, float)):
+        return {"sentiment_label": label, "sentiment_score": float(score), "sentiment_source": "llm"}
+    return None
+
+
+class NLPService(LazyService):
     _instance = None
     _llm = None
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(NLPService, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-
     def _initialize(self):
-        if self._llm is None:
-            if not GOOGLE_API_KEY:
-                raise ValueError("GOOGLE_API_KEY environment variable not set for NLPService.")
+        if settings.SENTIMENT_MODE in ("local", "hybrid") and not local_sentiment_classifier.is_available:
+            local_sentiment_classifier.load()
+        # Pure local mode only needs the LLM when no trained classifier is available
+        needs_llm = settings.SENTIMENT_MODE != "local" or not local_sentiment_classifier.is_available
+        if self._llm is None and needs_llm:
             try:
-                self._llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL_NAME, google_api_key=GOOGLE_API_KEY)
-                # Small test call
-                self._llm.invoke("Hello.")
-                print(f"NLPService LLM (Gemini {GEMINI_MODEL_NAME}) initialized successfully.")
+                self._llm = get_llm()
+                print("NLPService LLM initialized successfully.")
             except Exception as e:
                 print(f"Error initializing NLPService LLM: {e}")
-                raise ConnectionError(f"NLPService Gemini connection error: {e}")
+                raise
+
+    def _use_local_classifier(self) -> bool:
+        return settings.SENTIMENT_MODE in ("local", "hybrid") and local_sentiment_classifier.is_available
+
+    def _accept_local(self, result: Dict[str, Any]) -> bool:
+        return settings.SENTIMENT_MODE == "local" or result["confidence"] >= settings.SENTIMENT_LOCAL_MIN_CONFIDENCE
 
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
-        Analyzes the sentiment of the given text using Gemini LLM.
+        Analyzes the sentiment of the given text according to SENTIMENT_MODE:
+        the local embedding classifier, the configured LLM, or local first with
+        low-confidence texts escalated to the LLM ("hybrid").
         Returns a dictionary with 'sentiment_label' (Positive, Negative, Neutral)
         and 'sentiment_score' (a float, if extracted).
         """
@@ -46,6 +95,20 @@ class NLPService:
             print("DEBUG: Empty text provided for sentiment analysis. Returning Neutral.")
             return {"sentiment_label": "Neutral", "sentiment_score": 0.0}
 
+        await self.ensure_ready()
+
+        if self._use_local_classifier():
+            local_result = (await asyncio.to_thread(local_sentiment_classifier.predict, [text]))[0]
+            if self._accept_local(local_result):
+                metrics.incr("sentiment.local")
+                return local_result
+            metrics.incr("sentiment.escalated")
+
+        return await self._analyze_sentiment_llm(text)
+
+    async def _analyze_sentiment_llm(self, text: str) -> Dict[str, Any]:
+        metrics.incr("sentiment.llm")
+
         # Prompt engineering for sentiment analysis
         prompt_template = ChatPromptTemplate.from_messages([
             SystemMessagePromptTemplate.from_template("""
@@ -69,50 +132,113 @@ class NLPService:
 
             print(f"DEBUG: Raw LLM response for sentiment: '{raw_response_content}'")
 
-            # Handle common Gemini response formats
-            # Strip markdown code blocks if present
-            if raw_response_content.strip().startswith("```json"):
-                json_start = raw_response_content.find("```json") + 7
-                json_end = raw_response_content.find("```", json_start)
-                if json_end != -1:
-                    json_str = raw_response_content[json_start:json_end].strip()
-                    print(f"DEBUG: Extracted JSON from markdown: '{json_str}'")
-                else:
-                    json_str = raw_response_content[json_start:].strip()
-                    print(f"DEBUG: Extracted JSON from markdown (no end): '{json_str}'")
-            elif raw_response_content.strip().startswith("```"):
-                # Generic code block
-                json_start = raw_response_content.find("```") + 3
-                json_end = raw_response_content.find("```", json_start)
-                if json_end != -1:
-                    json_str = raw_response_content[json_start:json_end].strip()
-                    print(f"DEBUG: Extracted JSON from generic code block: '{json_str}'")
-                else:
-                    json_str = raw_response_content[json_start:].strip()
-                    print(f"DEBUG: Extracted JSON from generic code block (no end): '{json_str}'")
-            else:
-                json_str = raw_response_content.strip()
+            json_str = _extract_json_str(raw_response_content)
 
             try:
                 sentiment_data = json.loads(json_str)
-                label = sentiment_data.get("sentiment_label")
-                score = sentiment_data.get("sentiment_score")
+                parsed = _parse_sentiment(sentiment_data)
 
-                if label in ["Positive", "Negative", "Neutral"] and isinstance(score, (int, float)):
-                    print(f"DEBUG: Successfully parsed sentiment - Label: {label}, Score: {score}")
-                    return {"sentiment_label": label, "sentiment_score": float(score)}
+                if parsed is not None:
+                    print(f"DEBUG: Successfully parsed sentiment - Label: {parsed['sentiment_label']}, Score: {parsed['sentiment_score']}")
+                    return parsed
                 else:
                     print(f"WARNING: LLM returned valid JSON but with unexpected keys/values: {json_str}")
-                    return {"sentiment_label": "Neutral", "sentiment_score": 0.0}
+                    return fallback_sentiment()
 
             except json.JSONDecodeError:
                 print(f"WARNING: LLM response was not valid JSON. Response: '{json_str}'")
-                return {"sentiment_label": "Neutral", "sentiment_score": 0.0}
+                return fallback_sentiment()
 
         except Exception as e:
             print(f"ERROR: During sentiment analysis LLM call for text: '{text[:50]}...' Error: {e}")
-            return {"sentiment_label": "Neutral", "sentiment_score": 0.0}
+            return fallback_sentiment()
 
+    async def analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Scores many texts with one LLM call per SENTIMENT_BATCH_SIZE items (after the local
+        classifier, when enabled, has handled the confident ones). Results are returned in input
+        order. Items the LLM omitted or returned malformed are re-scored individually, one call at
+        a time; when a whole chunk's call fails its items get fallback_sentiment() instead, so a
+        failing or rate-limited API isn't hit with a burst of single calls (callers store those
+        as 'failed', and a later backfill retries them).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if not text.strip():
+                results[i] = {"sentiment_label": "Neutral", "sentiment_score": 0.0}
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+
+        await self.ensure_ready()
+
+        if self._use_local_classifier():
+            local_results = await asyncio.to_thread(local_sentiment_classifier.predict, [texts[i] for i in pending])
+            escalated = []
+            for i, local_result in zip(pending, local_results):
+                if self._accept_local(local_result):
+                    results[i] = local_result
+                else:
+                    escalated.append(i)
+            metrics.incr("sentiment.local", len(pending) - len(escalated))
+            metrics.incr("sentiment.escalated", len(escalated))
+            pending = escalated
+            if not pending:
+                return results
+
+        metrics.incr("sentiment.llm", len(pending))
+        batch_size = max(settings.SENTIMENT_BATCH_SIZE, 1)
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            parsed = await self._analyze_chunk([(i, texts[i]) for i in chunk])
+            for i in chunk:
+                results[i] = fallback_sentiment() if parsed is None else parsed.get(i)
+
+        missing = [i for i in pending if results[i] is None]
+        if missing:
+            print(f"WARNING: Batch sentiment response missing {len(missing)} of {len(pending)} items; scoring them individually.")
+            for i in missing:
+                results[i] = await self._analyze_sentiment_llm(texts[i])
+        return results
+
+    async def _analyze_chunk(self, items: List[tuple]) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Returns {index: result} for the items the LLM scored, or None when the call itself failed."""
+        prompt_template = ChatPromptTemplate.from_messages([
+            SystemMessagePromptTemplate.from_template("""
+            You are a highly accurate sentiment analysis AI. You will receive a JSON array of journal entries,
+            each with an "index" and a "text". Determine the overall sentiment of every entry.
+            For each entry provide the sentiment label as one of: "Positive", "Negative", or "Neutral",
+            and a sentiment score between -1.0 (most negative) and 1.0 (most positive). If sentiment is neutral, score should be 0.0.
+            Respond ONLY with a JSON array containing one object per entry, echoing its "index". Ensure the JSON is perfectly valid.
+            No preamble, no explanation, no markdown backticks outside the JSON.
+            Example: [{{"index": 0, "sentiment_label": "Positive", "sentiment_score": 0.85}}, {{"index": 1, "sentiment_label": "Negative", "sentiment_score": -0.7}}]
+            """),
+            HumanMessagePromptTemplate.from_template("Analyze the sentiment of these entries: {entries}")
+        ])
+        chain = prompt_template | self._llm
+        entries = json.dumps([{"index": i, "text": text} for i, text in items], ensure_ascii=False)
 
-# Initialize the service globally (singleton)
+        try:
+            response = await chain.ainvoke({"entries": entries})
+            data = json.loads(_extract_json_str(response.content))
+        except Exception as e:
+            print(f"ERROR: Batch sentiment analysis failed for {len(items)} entries. Error: {e}")
+            return None
+
+        if not isinstance(data, list):
+            print(f"ERROR: Batch sentiment response for {len(items)} entries was not a JSON array.")
+            return None
+
+        expected = {i for i, _ in items}
+        parsed = {}
+        for item in data:
+            if isinstance(item, dict) and item.get("index") in expected:
+                result = _parse_sentiment(item)
+                if result is not None:
+                    parsed[item["index"]] = result
+        return parsed
+
+# Singleton handle; the LLM is created lazily on first use or by the startup warm-up task
 nlp_service_instance = NLPService()
\ No newline at end of file
@@ -1,49 +1,45 @@
+import asyncio
 import os
-from dotenv import load_dotenv # <-- Ensure load_dotenv is imported
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_community.vectorstores import Chroma
-# from langchain_community.llms import Ollama # <-- COMMENT OUT or REMOVE this import
-from langchain_google_genai import ChatGoogleGenerativeAI # <-- ADD THIS IMPORT for Gemini
-from langchain.chains import ConversationalRetrievalChain
 from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate, SystemMessagePromptTemplate
 from langchain_core.messages import HumanMessage, AIMessage
 from fastapi import HTTPException # <-- ADD THIS IMPORT
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from .. import models, crud
+from ..config import settings
+from .embeddings import get_embeddings
+from .response_cache import GENERIC_USER_CONTEXT, is_knowledge_only, response_cache
+from .retrieval_cache import CachedRetriever, knowledge_base_version
+from .lazy import LazyService
+from .llm_provider import get_llm
 
 # --- Configuration ---
 CHROMA_PERSIST_DIRECTORY = "./chroma_db"
-# OLLAMA_MODEL_NAME = "mistral" # <-- COMMENT OUT or REMOVE
-# OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434") # <-- COMMENT OUT or REMOVE
-
-# NEW: Gemini specific configuration
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY") # <-- ADD THIS
-GEMINI_MODEL_NAME = "gemini-2.0-flash" 
+# Written by ingest_data.py; its content versions the retrieval and response caches
+KNOWLEDGE_BASE_MANIFEST = os.path.join(CHROMA_PERSIST_DIRECTORY, "ingest_manifest.json")
+# LLM provider/model settings live in app/config.py (see llm_provider.get_llm)
 # --- End Configuration ---
 
-class ChatbotService:
+class ChatbotService(LazyService):
     _instance = None
     _llm = None
     _retriever = None
     _conversation_chain = None
     _embeddings = None
 
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super(ChatbotService, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
-
     def _initialize(self):
         print("Initializing ChatbotService components...")
+        # Heavy imports are deferred so importing app.main stays fast
+        from langchain_community.vectorstores import Chroma
+        from langchain.chains import ConversationalRetrievalChain
+        from langchain.chains.conversational_retrieval.prompts import CONDENSE_QUESTION_PROMPT
 
-        # Initialize Embeddings (still using SentenceTransformers for ChromaDB)
+        # Initialize Embeddings (SentenceTransformers, shared with the local sentiment classifier)
         if self._embeddings is None:
-            self._embeddings = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-            print("Embeddings model loaded.")
+            self._embeddings = get_embeddings()
 
         # Initialize ChromaDB as Retriever
         if self._retriever is None:
@@ -53,26 +49,24 @@ class ChatbotService:
                 raise FileNotFoundError(f"Chatbot knowledge base not found at {CHROMA_PERSIST_DIRECTORY}.")
 
             print("Loading ChromaDB from persistence...")
-            vectordb = Chroma(
-                persist_directory=CHROMA_PERSIST_DIRECTORY,
-                embedding_function=self._embeddings
-            )
-            self._retriever = vectordb.as_retriever(search_kwargs={"k": 3})
+            def open_vectordb():
+                return Chroma(
+                    persist_directory=CHROMA_PERSIST_DIRECTORY,
+                    embedding_function=self._embeddings
+                )
+            vectordb = open_vectordb()
+            if settings.RETRIEVER_CACHE_SIZE > 0:
+                self._retriever = CachedRetriever(
+                    vectorstore=vectordb, open_vectorstore=open_vectordb, k=3,
+                    cache_size=settings.RETRIEVER_CACHE_SIZE, manifest_path=KNOWLEDGE_BASE_MANIFEST
+                )
+            else:
+                self._retriever = vectordb.as_retriever(search_kwargs={"k": 3})
             print("ChromaDB retriever initialized.")
 
-        # --- MODIFIED: Initialize Gemini LLM instead of Ollama ---
+        # Initialize the configured LLM (Gemini or the offline fake provider)
         if self._llm is None:
-            if not GOOGLE_API_KEY:
-                raise ValueError("GOOGLE_API_KEY environment variable not set. Please get an API key from Google AI Studio.")
-            try:
-                self._llm = ChatGoogleGenerativeAI(model=GEMINI_MODEL_NAME, google_api_key=GOOGLE_API_KEY)
-                # Small test call to verify connection
-                self._llm.invoke("Hello, are you there?")
-                print(f"Gemini LLM initialized and test successful with model: {GEMINI_MODEL_NAME}")
-            except Exception as e:
-                print(f"Error: Gemini LLM not reachable or configuration issue. Details: {e}")
-                raise ConnectionError(f"Gemini connection error: {e}") # Raise a specific error
-        # --- END MODIFIED ---
+            self._llm = get_llm()
 
         # Initialize Conversation Chain
         if self._conversation_chain is None:
@@ -94,24 +88,27 @@ class ChatbotService:
             {chat_history}
             """
 
+            self._answer_prompt = ChatPromptTemplate.from_messages([
+                SystemMessagePromptTemplate.from_template(system_template),
+                HumanMessagePromptTemplate.from_template("{question}")
+            ])
+            # Same condense step the chain uses; the streaming path runs it directly
+            self._condense_prompt = CONDENSE_QUESTION_PROMPT
+
             self._conversation_chain = ConversationalRetrievalChain.from_llm(
                 llm=self._llm,
                 retriever=self._retriever,
                 return_source_documents=True,
-                combine_docs_chain_kwargs={
-                    "prompt": ChatPromptTemplate.from_messages([
-                        SystemMessagePromptTemplate.from_template(system_template),
-                        HumanMessagePromptTemplate.from_template("{question}")
-                    ])
-                }
+                combine_docs_chain_kwargs={"prompt": self._answer_prompt}
             )
             print("ConversationalRetrievalChain initialized with custom prompt.")
 
-    # ... (rest of get_chatbot_response function, it remains largely the same) ...
-    async def get_chatbot_response(self, user_id: int, user_message: str, db: Session):
-        # --- MODIFIED: Fetching & Formatting Chat History for LLM ---
-        db_chat_messages = crud.get_user_chat_messages(db, user_id, limit=10) # Fetch last 10 messages
-        chat_history_for_llm = [] # Use a new variable name to avoid confusion
+    async def _build_chat_history(self, db: AsyncSession, user_id: int) -> List[Tuple[str, str]]:
+        """
+        Pairs recent stored messages into (user, ai) tuples for the LLM.
+        """
+        db_chat_messages = await crud.get_recent_chat_messages(db, user_id, limit=10) # Fetch last 10 messages
+        chat_history_for_llm = []
 
         user_msg_buffer = None
         for msg in db_chat_messages:
@@ -123,10 +120,14 @@ class ChatbotService:
                     user_msg_buffer = None # Reset buffer after pairing
                 else:
                     chat_history_for_llm.append(("", msg.content))
+        return chat_history_for_llm
 
-        # --- Personalization & Context (remains the same) ---
+    async def _build_user_context(self, db: AsyncSession, user_id: int) -> str:
+        """
+        Summarizes recent mood and journal data for prompt personalization.
+        """
         mood_summary = "No recent mood entries available."
-        recent_mood_trends = crud.get_mood_trends(db, user_id, days=7)
+        recent_mood_trends = await crud.get_mood_trends(db, user_id, days=7)
         if recent_mood_trends:
             actual_moods = [m for m in recent_mood_trends if m['average_mood'] > 0]
             if actual_moods:
@@ -134,7 +135,7 @@ class ChatbotService:
                 mood_summary = f"User's average mood in the last 7 days is {latest_mood_val:.1f}."
 
         journal_summary = "No recent journal entries available."
-        recent_journal_entries = crud.get_user_journal_entries(db, user_id, limit=2)
+        recent_journal_entries = await crud.get_user_journal_entries(db, user_id, limit=2)
         if recent_journal_entries:
             journal_summary_parts = []
             for entry in recent_journal_entries:
@@ -142,21 +143,91 @@ class ChatbotService:
                 journal_summary_parts.append(f"'{entry.title or 'Journal Entry'}: {content_preview}'")
             journal_summary = "Recent journal entries include: " + "; ".join(journal_summary_parts)
 
-        user_context_string = f"Mood data: {mood_summary}. Journal data: {journal_summary}."
+        return f"Mood data: {mood_summary}. Journal data: {journal_summary}."
+
+    async def _standalone_question(self, user_message: str, chat_history: List[Tuple[str, str]]) -> str:
+        # Mirror ConversationalRetrievalChain: condense follow-ups into a standalone question first
+        if not chat_history:
+            return user_message
+        condensed = await (self._condense_prompt | self._llm).ainvoke(
+            {"question": user_message, "chat_history": _format_chat_history(chat_history)}
+        )
+        return condensed.content
+
+    def _embed_question(self, question: str) -> List[float]:
+        if isinstance(self._retriever, CachedRetriever):
+            return self._retriever.embed_query(question) # Cached, so retrieval on a miss reuses it
+        return self._embeddings.embed_query(question)
+
+    async def _cached_response(self, user_message: str, question: str) -> Tuple[Optional[List[float]], Optional[Dict[str, Any]]]:
+        """
+        Semantic response cache lookup (RESPONSE_CACHE_ENABLED) for the standalone question.
+        Returns (question embedding, cached answer); the embedding is None when the question isn't
+        knowledge-only, i.e. not cacheable, and the answer is None on a miss.
+        """
+        if not settings.RESPONSE_CACHE_ENABLED or not is_knowledge_only(user_message, question):
+            return None, None
+        embedding = await asyncio.to_thread(self._embed_question, question)
+        return embedding, response_cache.get(embedding, knowledge_base_version(KNOWLEDGE_BASE_MANIFEST))
+
+    async def _answer(self, question: str, chat_history_str: str, user_context: str) -> Tuple[str, List[Any]]:
+        """
+        Retrieval and answer for an already standalone question, i.e. ConversationalRetrievalChain
+        without its condense step.
+        """
+        source_documents = await self._retriever.ainvoke(question)
+        answer = await (self._answer_prompt | self._llm).ainvoke({
+            "question": question,
+            "chat_history": chat_history_str,
+            "user_context": user_context,
+            "context": "\n\n".join(doc.page_content for doc in source_documents),
+        })
+        return answer.content, source_documents
+
+    async def get_chatbot_response(self, user_id: int, user_message: str, db: AsyncSession):
+        await self.ensure_ready()
+
+        chat_history_for_llm = await self._build_chat_history(db, user_id)
 
-        # Invoke the chain
         try:
-            result = await self._conversation_chain.ainvoke(
-                {"question": user_message, "chat_history": chat_history_for_llm, "user_context": user_context_string} # <-- USE THE NEW VARIABLE HERE
-            )
-            ai_response = result['answer']
-            source_documents = result.get('source_documents', [])
+            question_embedding = None
+            # Only a message that could be knowledge-only is worth condensing up front for the cache
+            # lookup; anything else goes straight to the chain, which condenses it once
+            if settings.RESPONSE_CACHE_ENABLED and is_knowledge_only(user_message):
+                question = await self._standalone_question(user_message, chat_history_for_llm)
+                question_embedding, cached = await self._cached_response(user_message, question)
+                if cached is not None:
+                    await crud.create_chat_message(db, user_id, user_message, is_user_message=True)
+                    await crud.create_chat_message(db, user_id, cached["response"], is_user_message=False)
+                    return cached
+
+                if question_embedding is not None:
+                    # Cacheable answers are shared between users: answer the standalone question on
+                    # its own, without the conversation or the asker's mood/journal data
+                    ai_response, source_documents = await self._answer(question, "", GENERIC_USER_CONTEXT)
+                else:
+                    # Already condensed, so skip the chain's own condense step
+                    user_context_string = await self._build_user_context(db, user_id)
+                    ai_response, source_documents = await self._answer(
+                        question, _format_chat_history(chat_history_for_llm), user_context_string
+                    )
+            else:
+                user_context_string = await self._build_user_context(db, user_id)
+                # Invoke the chain
+                result = await self._conversation_chain.ainvoke(
+                    {"question": user_message, "chat_history": chat_history_for_llm, "user_context": user_context_string}
+                )
+                ai_response = result['answer']
+                source_documents = result.get('source_documents', [])
 
             # Store the conversation in DB for future memory
-            crud.create_chat_message(db, user_id, user_message, is_user_message=True)
-            crud.create_chat_message(db, user_id, ai_response, is_user_message=False)
+            await crud.create_chat_message(db, user_id, user_message, is_user_message=True)
+            await crud.create_chat_message(db, user_id, ai_response, is_user_message=False)
 
-            return {"response": ai_response, "sources": [{"content": doc.page_content, "metadata": doc.metadata} for doc in source_documents]}
+            sources = _format_sources(source_documents)
+            if question_embedding is not None:
+                response_cache.put(question_embedding, ai_response, sources, knowledge_base_version(KNOWLEDGE_BASE_MANIFEST))
+            return {"response": ai_response, "sources": sources}
 
         except Exception as e:
             print(f"Error during LLM invocation: {e}")
@@ -165,4 +236,67 @@ class ChatbotService:
                 detail=f"Chatbot processing error. Please try again. Details: {e}"
             )
 
+    async def stream_chatbot_response(self, user_id: int, user_message: str, db: AsyncSession) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of get_chatbot_response. Yields events:
+        {"type": "sources"} once retrieval is done, {"type": "token"} per LLM chunk,
+        then {"type": "done"} after the conversation has been stored (or {"type": "error"}).
+        """
+        await self.ensure_ready()
+
+        chat_history_for_llm = await self._build_chat_history(db, user_id)
+        chat_history_str = _format_chat_history(chat_history_for_llm)
+
+        try:
+            question = await self._standalone_question(user_message, chat_history_for_llm)
+            question_embedding, cached = await self._cached_response(user_message, question)
+            if cached is not None:
+                yield {"type": "sources", "sources": cached["sources"]}
+                yield {"type": "token", "content": cached["response"]}
+                await crud.create_chat_message(db, user_id, user_message, is_user_message=True)
+                await crud.create_chat_message(db, user_id, cached["response"], is_user_message=False)
+                yield {"type": "done", "response": cached["response"]}
+                return
+            if question_embedding is not None:
+                # Shared answer: no conversation or user data in the prompt (see get_chatbot_response)
+                user_context_string, chat_history_str = GENERIC_USER_CONTEXT, ""
+            else:
+                user_context_string = await self._build_user_context(db, user_id)
+
+            source_documents = await self._retriever.ainvoke(question)
+            sources = _format_sources(source_documents)
+            yield {"type": "sources", "sources": sources}
+
+            answer_parts = []
+            async for chunk in (self._answer_prompt | self._llm).astream({
+                "question": question,
+                "chat_history": chat_history_str,
+                "user_context": user_context_string,
+                "context": "\n\n".join(doc.page_content for doc in source_documents),
+            }):
+                if chunk.content:
+                    answer_parts.append(chunk.content)
+                    yield {"type": "token", "content": chunk.content}
+
+            ai_response = "".join(answer_parts)
+            await crud.create_chat_message(db, user_id, user_message, is_user_message=True)
+            await crud.create_chat_message(db, user_id, ai_response, is_user_message=False)
+            if question_embedding is not None:
+                response_cache.put(question_embedding, ai_response, sources, knowledge_base_version(KNOWLEDGE_BASE_MANIFEST))
+            yield {"type": "done", "response": ai_response}
+
+        except Exception as e:
+            print(f"Error during streaming LLM invocation: {e}")
+            yield {"type": "error", "detail": "Chatbot processing error. Please try again."}
+
+
+def _format_chat_history(chat_history: List[Tuple[str, str]]) -> str:
+    # Same "Human/Assistant" layout ConversationalRetrievalChain uses for its prompts
+    return "".join(f"\nHuman: {human}\nAssistant: {ai}" for human, ai in chat_history)
+
+
+def _format_sources(source_documents) -> List[Dict[str, Any]]:
+    return [{"content": doc.page_content, "metadata": doc.metadata} for doc in source_documents]
+
+# Singleton handle; embeddings, ChromaDB and the LLM load lazily on first use or by the startup warm-up task
 chatbot_service_instance = ChatbotService()
\ No newline at end of file
@@ -0,0 +1,124 @@
+# backend/app/services/response_cache.py
+
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .. import metrics
+from ..config import settings
+
+# Prompt context used for cacheable answers in place of the asking user's mood/journal summary,
+# so a stored answer never carries one user's data to another
+GENERIC_USER_CONTEXT = "Not used for this question: answer it as general self-help information."
+
+# Generic "how do I ..." phrasings ask for information rather than describe the asker, so they're
+# removed before looking for first-person references
+_GENERIC_FIRST_PERSON = re.compile(r"\b(how|what|where|when|who)\s+(do|can|should|could|would|might)\s+i\b", re.IGNORECASE)
+# Questions about the asker's own state or data are personal
+_PERSONAL = re.compile(r"\b(i|i'm|im|i've|i'd|i'll|me|my|mine|myself)\b", re.IGNORECASE)
+# Safety/crisis topics are never answered from the cache, however they're phrased
+_CRISIS = re.compile(
+    r"suicid|\bkill|\bdie\b|\bdying\b|\bdead\b|death|end (it|my life|things)|self[- ]?harm|hurt (myself|me|someone)|"
+    r"\bcut(ting)?\b|overdos|hopeless|worthless|no reason to live|abus|\brape|assault|emergency|crisis",
+    re.IGNORECASE,
+)
+
+
+def _normalize_apostrophes(text: str) -> str:
+    return text.replace("\u2019", "'").replace("\u2018", "'")
+
+
+def is_knowledge_only(*questions: str) -> bool:
+    """
+    True when every given phrasing of the question (the user's message and its standalone,
+    condensed form) is a generic self-help question ("how do I deal with stress?") whose answer
+    depends only on the knowledge base: nothing about the asker and no safety/crisis topic.
+    """
+    for question in questions:
+        text = _normalize_apostrophes(question)
+        if _CRISIS.search(text) or _PERSONAL.search(_GENERIC_FIRST_PERSON.sub(" ", text)):
+            return False
+    return True
+
+
+class SemanticResponseCache:
+    """
+    Process-local cache of chatbot answers (with their sources) for knowledge-only questions,
+    matched by cosine similarity of question embeddings. Entries expire after `ttl` seconds; when
+    full, the least recently used entry is evicted. Everything is dropped when the knowledge base
+    version changes, since answers were grounded in the old documents.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, threshold: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._matrix = None # Stacked unit vectors of _entries, rebuilt after changes
+        self._matrix_keys: List[str] = []
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(embedding: List[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _sync_version(self, version: Any):
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self._matrix = None
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def get(self, embedding: List[float], version: Any) -> Optional[Dict[str, Any]]:
+        """Returns {"response", "sources"} of the most similar stored question above the threshold."""
+        with self._lock:
+            self._sync_version(version)
+            self._expire()
+            if not self._entries:
+                metrics.incr("response_cache.miss")
+                return None
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries)
+                self._matrix = np.stack([self._entries[key]["vector"] for key in self._matrix_keys])
+            similarities = self._matrix @ self._unit(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                metrics.incr("response_cache.miss")
+                return None
+            key = self._matrix_keys[best]
+            self._entries.move_to_end(key)
+            entry = self._entries[key]
+        metrics.incr("response_cache.hit")
+        return {"response": entry["response"], "sources": entry["sources"]}
+
+    def put(self, embedding: List[float], response: str, sources: List[Dict[str, Any]], version: Any):
+        with self._lock:
+            self._sync_version(version)
+            self._entries[uuid.uuid4().hex] = {
+                "vector": self._unit(embedding), "response": response, "sources": sources,
+                "expires_at": time.monotonic() + self.ttl,
+            }
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+
+response_cache = SemanticResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    threshold=settings.RESPONSE_CACHE_SIMILARITY,
+)
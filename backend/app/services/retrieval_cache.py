@@ -0,0 +1,119 @@
+# backend/app/services/retrieval_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import PrivateAttr
+
+from .. import metrics
+
+
+# manifest path -> (mtime, version), so the manifest is only re-read after ingest_data.py rewrote it
+_manifest_versions: Dict[str, Tuple[int, str]] = {}
+
+
+def knowledge_base_version(manifest_path: str) -> Optional[str]:
+    """
+    Hash of the knowledge base content recorded in ingest_data.py's manifest: the collection,
+    ingestion settings and each file's content hash and chunk count (None before the first run).
+    An ingest run that changes nothing keeps the version, even if it rewrites the file.
+    """
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+        cached = _manifest_versions.get(manifest_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    content = {
+        "collection": manifest.get("collection"),
+        "settings": manifest.get("settings"),
+        "files": {relpath: [entry.get("sha256"), entry.get("chunks")] for relpath, entry in manifest.get("files", {}).items()},
+    }
+    version = hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+    _manifest_versions[manifest_path] = (mtime, version)
+    return version
+
+
+def normalize_query(query: str) -> str:
+    # Case, spacing and trailing punctuation don't change what a question retrieves
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+class CachedRetriever(BaseRetriever):
+    """
+    Top-k Chroma retriever with two LRU caches keyed by the normalized question: its embedding,
+    and the top-k chunks retrieved for it. When ingest_data.py changes the knowledge base the
+    results are dropped and the store is reopened through `open_vectorstore`, since a rebuild
+    replaces the collection the old handle points at; embeddings don't depend on the documents
+    and are kept. A re-ingest is therefore picked up without restarting the API.
+    """
+
+    vectorstore: Any
+    open_vectorstore: Callable[[], Any]
+    k: int = 3
+    manifest_path: str
+    cache_size: int = 1024
+
+    _embeddings: LRUCache = PrivateAttr()
+    _results: LRUCache = PrivateAttr()
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _manifest_version: Optional[str] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any):
+        self._embeddings = LRUCache(maxsize=self.cache_size)
+        self._results = LRUCache(maxsize=self.cache_size)
+        self._manifest_version = knowledge_base_version(self.manifest_path)
+
+    def _check_manifest(self):
+        version = knowledge_base_version(self.manifest_path)
+        if version == self._manifest_version:
+            return
+        with self._lock:
+            if version == self._manifest_version:
+                return # Another thread already reloaded
+            self.vectorstore = self.open_vectorstore()
+            self._results.clear()
+            self._manifest_version = version
+        metrics.incr("retriever_cache.invalidated")
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embeds a question through the embedding cache. Also used by the response cache lookup, so
+        a question that misses there isn't embedded a second time for retrieval.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            embedding = self._embeddings.get(key)
+        if embedding is not None:
+            metrics.incr("retriever_cache.embedding.hit")
+            return embedding
+        metrics.incr("retriever_cache.embedding.miss")
+        embedding = self.vectorstore.embeddings.embed_query(query)
+        with self._lock:
+            self._embeddings[key] = embedding
+        return embedding
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        self._check_manifest()
+        key = normalize_query(query)
+        with self._lock:
+            documents = self._results.get(key)
+        if documents is not None:
+            metrics.incr("retriever_cache.results.hit")
+            return list(documents)
+        metrics.incr("retriever_cache.results.miss")
+
+        documents = self.vectorstore.similarity_search_by_vector(self.embed_query(query), k=self.k)
+        with self._lock:
+            self._results[key] = list(documents)
+        return documents
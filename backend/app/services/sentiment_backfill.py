@@ -0,0 +1,55 @@
+# backend/app/services/sentiment_backfill.py
+
+import asyncio
+from typing import Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud
+from ..config import settings
+from .nlp_service import nlp_service_instance as nlp_service
+from .sentiment_cache import sentiment_cache, content_hash
+
+
+async def backfill_journal_sentiment(db: AsyncSession, user_id: Optional[int] = None, limit: Optional[int] = None, concurrency: int = 1) -> Dict[str, int]:
+    """
+    Fills sentiment_label/sentiment_score for journal entries where they are NULL
+    (e.g. rows written before the sentiment migration). Cached texts are applied directly;
+    the rest are scored SENTIMENT_BATCH_SIZE entries per LLM call, `concurrency` calls at a time.
+    """
+    stats = {"scanned": 0, "cached": 0, "scored": 0, "failed": 0}
+    batch_size = max(settings.SENTIMENT_BATCH_SIZE, 1)
+    page_size = batch_size * max(concurrency, 1)
+    after_id = 0
+
+    while limit is None or stats["scanned"] < limit:
+        rows = await crud.get_journal_entries_missing_sentiment(db, limit=page_size, after_id=after_id, user_id=user_id)
+        if limit is not None:
+            rows = rows[:limit - stats["scanned"]]
+        if not rows:
+            break
+        after_id = rows[-1].id
+        stats["scanned"] += len(rows)
+
+        results = {}
+        uncached = []
+        for row in rows:
+            cached = await sentiment_cache.get(db, content_hash(row.content))
+            if cached is not None:
+                results[row.id] = cached
+                stats["cached"] += 1
+            else:
+                uncached.append(row)
+
+        chunks = [uncached[i:i + batch_size] for i in range(0, len(uncached), batch_size)]
+        scored_chunks = await asyncio.gather(*(nlp_service.analyze_sentiment_batch([r.content for r in chunk]) for chunk in chunks))
+        for chunk, chunk_results in zip(chunks, scored_chunks):
+            for row, result in zip(chunk, chunk_results):
+                results[row.id] = result
+                await sentiment_cache.put(db, content_hash(row.content), result)
+                stats["failed" if result.get("is_fallback") else "scored"] += 1
+
+        await crud.apply_sentiment_results(db, results)
+        print(f"Backfill progress: {stats}")
+
+    return stats
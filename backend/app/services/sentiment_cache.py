@@ -0,0 +1,87 @@
+# backend/app/services/sentiment_cache.py
+
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cachetools import TTLCache
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import metrics, models
+from ..config import settings
+from .sentiment_classifier import local_sentiment_classifier
+
+
+def content_hash(text: str) -> str:
+    """
+    Cache key for a journal text. Includes the sentiment mode, LLM provider/model and the loaded
+    local classifier's version so switching any of them (e.g. retraining the classifier) never
+    serves scores produced by a different model.
+    """
+    signature = f"{settings.SENTIMENT_MODE}:{settings.LLM_PROVIDER}:{settings.GEMINI_MODEL_NAME}"
+    if settings.SENTIMENT_MODE in ("local", "hybrid"):
+        signature += f":{local_sentiment_classifier.version}"
+    signature += f"\n{text.strip()}"
+    return hashlib.sha256(signature.encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """
+    Two-level sentiment cache: an in-process LRU with TTL, backed by the optional
+    `sentiment_cache` table (SENTIMENT_CACHE_PERSISTENT) shared by all workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, persistent: bool):
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.persistent = persistent
+
+    async def get(self, db: AsyncSession, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._memory.get(key)
+        if result is not None:
+            metrics.incr("sentiment_cache.memory_hit")
+            return dict(result)
+
+        if self.persistent:
+            row = await db.get(models.SentimentCacheEntry, key)
+            if row is not None:
+                metrics.incr("sentiment_cache.persistent_hit")
+                result = {"sentiment_label": row.sentiment_label, "sentiment_score": row.sentiment_score, "sentiment_source": row.sentiment_source}
+                with self._lock:
+                    self._memory[key] = result
+                return dict(result)
+
+        metrics.incr("sentiment_cache.miss")
+        return None
+
+    async def put(self, db: AsyncSession, key: str, result: Dict[str, Any]):
+        if result.get("is_fallback"):
+            return # Never cache the neutral placeholder returned on LLM errors
+        value = {"sentiment_label": result["sentiment_label"], "sentiment_score": result["sentiment_score"], "sentiment_source": result.get("sentiment_source")}
+        with self._lock:
+            self._memory[key] = value
+        if self.persistent:
+            # Flushed with the caller's transaction (the journal entry commit)
+            await db.execute(
+                pg_insert(models.SentimentCacheEntry)
+                .values(content_hash=key, **value)
+                .on_conflict_do_nothing(index_elements=["content_hash"])
+            )
+
+    async def get_or_analyze(self, db: AsyncSession, text: str, analyze: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = content_hash(text)
+        cached = await self.get(db, key)
+        if cached is not None:
+            return cached
+        result = await analyze(text)
+        await self.put(db, key, result)
+        return result
+
+
+sentiment_cache = SentimentCache(
+    maxsize=settings.SENTIMENT_CACHE_SIZE,
+    ttl=settings.SENTIMENT_CACHE_TTL_SECONDS,
+    persistent=settings.SENTIMENT_CACHE_PERSISTENT,
+)
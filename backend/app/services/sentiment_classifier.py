@@ -0,0 +1,64 @@
+# backend/app/services/sentiment_classifier.py
+
+import os
+from typing import Any, Dict, List
+
+from ..config import settings
+from .embeddings import embedding_model_id, get_embeddings
+
+SENTIMENT_LABELS = ("Negative", "Neutral", "Positive")
+
+
+class LocalSentimentClassifier:
+    """
+    Small logistic-regression head over sentence embeddings (the same model the RAG retriever uses).
+    Trained offline with `python train_sentiment_classifier.py` from LLM-labelled journal entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._model = None
+        self.version = None # mtime of the loaded artifact; part of the sentiment cache key
+
+    @property
+    def is_available(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            print(f"Warning: Local sentiment classifier not found at '{self.path}'. Run 'python train_sentiment_classifier.py' to create it.")
+            return
+        import joblib # Ships with scikit-learn
+
+        version = os.stat(self.path).st_mtime_ns # Taken before loading, so a concurrent retrain can't be mislabelled
+        artifact = joblib.load(self.path)
+        if artifact.get("embedding_model") != embedding_model_id():
+            print(f"Warning: Local sentiment classifier was trained on '{artifact.get('embedding_model')}' embeddings, not '{embedding_model_id()}'. Ignoring it.")
+            return
+        get_embeddings() # Load the embedding model now rather than on the first journal write
+        self._model = artifact["model"]
+        self.version = version
+        print(f"Local sentiment classifier loaded from '{self.path}'.")
+
+    def predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Blocking (CPU-bound) prediction. Each result carries the usual sentiment keys plus
+        'confidence', the probability of the predicted label.
+        """
+        vectors = get_embeddings().embed_documents(texts)
+        probabilities = self._model.predict_proba(vectors)
+        classes = list(self._model.classes_)
+        results = []
+        for probs in probabilities:
+            by_label = dict(zip(classes, probs))
+            best = max(by_label, key=by_label.get)
+            results.append({
+                "sentiment_label": best,
+                "sentiment_score": round(float(by_label.get("Positive", 0.0) - by_label.get("Negative", 0.0)), 2),
+                "confidence": float(by_label[best]),
+                "sentiment_source": "local",
+            })
+        return results
+
+
+local_sentiment_classifier = LocalSentimentClassifier(settings.SENTIMENT_CLASSIFIER_PATH)
@@ -0,0 +1,95 @@
+# backend/app/services/sentiment_worker.py
+
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from .. import crud
+from ..config import settings
+from ..database import AsyncSessionLocal
+from .nlp_service import nlp_service_instance as nlp_service
+from .sentiment_cache import sentiment_cache
+
+
+class SentimentWorker:
+    """
+    Background scorer for journal entries saved with sentiment_status='pending'.
+    Jobs live in the sentiment_jobs table, so queued work survives restarts; up to
+    SENTIMENT_WORKER_CONCURRENCY jobs are analyzed at once per worker process.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight: Set[asyncio.Task] = set()
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        print(f"Sentiment worker started (concurrency {settings.SENTIMENT_WORKER_CONCURRENCY}).")
+
+    async def stop(self):
+        """
+        Stops claiming jobs, gives in-flight ones SENTIMENT_WORKER_SHUTDOWN_SECONDS to finish and
+        cancels the rest. A cancelled job stays 'running' and is reclaimed once its lease expires.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._in_flight:
+            in_flight = set(self._in_flight)
+            _, unfinished = await asyncio.wait(in_flight, timeout=settings.SENTIMENT_WORKER_SHUTDOWN_SECONDS)
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+            print(f"Sentiment worker stopped ({len(in_flight) - len(unfinished)} in-flight jobs finished, {len(unfinished)} cancelled).")
+
+    def notify(self):
+        """Wakes the worker right away instead of waiting for the next poll."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            free_slots = settings.SENTIMENT_WORKER_CONCURRENCY - len(self._in_flight)
+            if free_slots > 0:
+                for job in await self._claim(free_slots):
+                    task = asyncio.create_task(self._process(job))
+                    self._in_flight.add(task)
+                    task.add_done_callback(self._in_flight.discard)
+            await self._wait_for_work(self._in_flight)
+
+    async def _wait_for_work(self, in_flight: Set[asyncio.Task]):
+        # Resume on a notify(), a finished job (free slot) or the poll interval, whichever comes first
+        waiter = asyncio.create_task(self._wakeup.wait())
+        try:
+            await asyncio.wait({waiter, *in_flight}, timeout=settings.SENTIMENT_WORKER_POLL_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+
+    async def _claim(self, limit: int):
+        async with AsyncSessionLocal() as db:
+            try:
+                return await crud.claim_sentiment_jobs(db, limit=limit, lease_seconds=settings.SENTIMENT_JOB_LEASE_SECONDS)
+            except Exception as e:
+                print(f"ERROR: Sentiment worker could not claim jobs: {e}")
+                return []
+
+    async def _process(self, job: Dict[str, Any]):
+        async with AsyncSessionLocal() as db:
+            try:
+                sentiment_result = await sentiment_cache.get_or_analyze(db, job["content"], nlp_service.analyze_sentiment)
+                await crud.complete_sentiment_job(db, job, sentiment_result)
+            except Exception as e:
+                print(f"ERROR: Sentiment job {job['job_id']} for journal entry {job['journal_entry_id']} failed: {e}")
+                await db.rollback()
+                await crud.retry_or_fail_sentiment_job(db, job, str(e))
+
+
+sentiment_worker = SentimentWorker()
@@ -0,0 +1,26 @@
+import argparse
+import asyncio
+
+from app.database import AsyncSessionLocal, engine
+from app.services.sentiment_backfill import backfill_journal_sentiment
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill sentiment_label/sentiment_score for journal entries where they are NULL.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only backfill this user's entries (default: all users)")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many entries")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batched LLM calls in flight at once")
+    return parser.parse_args()
+
+
+async def run_backfill(args):
+    try:
+        async with AsyncSessionLocal() as db:
+            stats = await backfill_journal_sentiment(db, user_id=args.user_id, limit=args.limit, concurrency=args.concurrency)
+    finally:
+        await engine.dispose()
+    print(f"Sentiment backfill complete: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_backfill(parse_args()))
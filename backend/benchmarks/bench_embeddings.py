@@ -0,0 +1,111 @@
+"""
+Compares the embedding engines on CPU: the current torch path (sentence-transformers), ONNX
+and int8-quantized ONNX. Reports document throughput (chunks/sec) over knowledge-base chunks,
+single-query embedding latency, and how closely each engine's vectors match torch's.
+
+Chunks come from the documents under ../data (split like ingest_data.py; PDFs are read from
+the ingest text cache when available), padded with synthetic text up to --chunks:
+
+    python -m benchmarks.bench_embeddings --chunks 1000 --batch-size 32 --threads 4
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+import numpy as np
+
+from app.services.embeddings import create_embeddings
+from ingest_data import CHUNK_OVERLAP, CHUNK_SIZE, DATA_PATH, TEXT_CACHE_DIRECTORY
+
+ENGINES = {
+    "torch": {"backend": "torch"},
+    "onnx": {"backend": "onnx"},
+    "onnx-int8": {"backend": "onnx", "quantized": True},
+}
+QUERIES = [
+    "How can I calm down during a panic attack?",
+    "What are early signs of depression?",
+    "Tips for sleeping better when stressed",
+    "How do I support a friend who is struggling?",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1000, help="Chunks embedded per throughput run")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per model call")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: runtime default)")
+    parser.add_argument("--queries", type=int, default=200, help="Timed single-query embeddings per engine")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"Comma-separated subset of: {', '.join(ENGINES)}")
+    return parser.parse_args()
+
+
+def corpus_chunks(count: int):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    texts = []
+    for pattern in ("**/*.txt", "**/*.md"):
+        for path in glob.glob(os.path.join(DATA_PATH, pattern), recursive=True):
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                texts.append(f.read())
+    for path in glob.glob(os.path.join(TEXT_CACHE_DIRECTORY, "*.json")):
+        with open(path, encoding="utf-8") as f:
+            texts.extend(d["page_content"] for d in json.load(f))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = [c for text in texts for c in splitter.split_text(text)][:count]
+    filler = "Synthetic benchmark text about stress, sleep, mood and coping strategies. " * 12
+    chunks += [f"{i}: {filler}" for i in range(count - len(chunks))]
+    return chunks
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def bench_engine(engine, chunks, queries: int):
+    engine.embed_documents(chunks[:8]) # Warm up
+    start = time.perf_counter()
+    vectors = engine.embed_documents(chunks)
+    throughput = len(chunks) / (time.perf_counter() - start)
+
+    latencies = []
+    for i in range(queries):
+        start = time.perf_counter()
+        engine.embed_query(QUERIES[i % len(QUERIES)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(vectors, dtype=np.float32), throughput, latencies
+
+
+def mean_cosine(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return float((a * b).sum(axis=1).mean())
+
+
+def main():
+    args = parse_args()
+    names = [n.strip() for n in args.engines.split(",") if n.strip()]
+    chunks = corpus_chunks(args.chunks)
+    print(f"{len(chunks)} chunks (avg {statistics.mean(len(c) for c in chunks):.0f} chars), "
+          f"batch size {args.batch_size}, threads {args.threads or 'default'}")
+
+    reference = None
+    for name in names:
+        start = time.perf_counter()
+        engine = create_embeddings(batch_size=args.batch_size, threads=args.threads, **ENGINES[name])
+        load_seconds = time.perf_counter() - start
+        vectors, throughput, latencies = bench_engine(engine, chunks, args.queries)
+        if reference is None:
+            reference = (name, vectors)
+        agreement = f"cos vs {reference[0]} {mean_cosine(vectors, reference[1]):.4f}" if reference[0] != name else "reference"
+        print(f"\n{name}")
+        print(f"  load {load_seconds:6.2f}s   {throughput:8.1f} chunks/sec   {agreement}")
+        print(f"  query p50 {statistics.median(latencies):7.2f} ms   p99 {percentile(latencies, 0.99):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Seeds a large synthetic mood/journal dataset and reports latency of the per-user insight queries.
+
+Run from the backend/ directory against a scratch database (it inserts millions of rows):
+
+    python -m benchmarks.bench_insight_queries --rows 10000000 --compare
+
+--compare drops the per-user indexes, times the queries, recreates the indexes and times them again.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+
+from app import crud
+from app.database import AsyncSessionLocal, engine
+from app.services.insights_cache import insights_cache
+
+BENCH_EMAIL_PREFIX = "bench_user_"
+SEED_CHUNK_ROWS = 1_000_000
+
+INDEX_DDL = {
+    "ix_mood_entries_owner_id_timestamp_id": "CREATE INDEX ix_mood_entries_owner_id_timestamp_id ON mood_entries (owner_id, timestamp, id)",
+    "ix_journal_entries_owner_id_timestamp_id": "CREATE INDEX ix_journal_entries_owner_id_timestamp_id ON journal_entries (owner_id, timestamp, id)",
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Mood entries to seed")
+    parser.add_argument("--journal-rows", type=int, default=2_000_000, help="Journal entries to seed")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic users the rows are spread across")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse previously seeded data")
+    parser.add_argument("--compare", action="store_true", help="Measure without and then with the per-user indexes")
+    return parser.parse_args()
+
+
+async def seed(db, users: int, mood_rows: int, journal_rows: int):
+    print(f"Seeding {users} users, {mood_rows} mood entries and {journal_rows} journal entries...")
+    await db.execute(text(
+        "INSERT INTO users (email, hashed_password, is_active) "
+        "SELECT :prefix || g || '@example.com', 'not-a-real-hash', true FROM generate_series(1, :users) g "
+        "ON CONFLICT (email) DO NOTHING"
+    ), {"prefix": BENCH_EMAIL_PREFIX, "users": users})
+    await db.commit()
+    user_ids = await bench_user_ids(db)
+
+    for offset in range(0, mood_rows, SEED_CHUNK_ROWS):
+        count = min(SEED_CHUNK_ROWS, mood_rows - offset)
+        await db.execute(text(
+            "INSERT INTO mood_entries (mood_value, timestamp, owner_id, tags) "
+            "SELECT 1 + floor(random() * 5)::int, now() - random() * interval '1095 days', "
+            "(:ids)[1 + (g % cardinality(CAST(:ids AS int[])))], "
+            "CASE g % 5 WHEN 0 THEN ARRAY['work','stress'] WHEN 1 THEN ARRAY['sleep'] "
+            "WHEN 2 THEN ARRAY['family','happy'] WHEN 3 THEN ARRAY['exercise','calm'] ELSE NULL END "
+            "FROM generate_series(1, :count) g"
+        ), {"ids": user_ids, "count": count})
+        await db.commit()
+        print(f"  mood_entries: {offset + count}/{mood_rows}")
+
+    for offset in range(0, journal_rows, SEED_CHUNK_ROWS):
+        count = min(SEED_CHUNK_ROWS, journal_rows - offset)
+        await db.execute(text(
+            "INSERT INTO journal_entries (title, content, timestamp, owner_id, sentiment_label, sentiment_score, sentiment_status) "
+            "SELECT 'Entry ' || g, 'Synthetic benchmark journal entry ' || g, now() - random() * interval '1095 days', "
+            "(:ids)[1 + (g % cardinality(CAST(:ids AS int[])))], "
+            "(ARRAY['Positive','Negative','Neutral'])[1 + (g % 3)], 0.0, 'done' "
+            "FROM generate_series(1, :count) g"
+        ), {"ids": user_ids, "count": count})
+        await db.commit()
+        print(f"  journal_entries: {offset + count}/{journal_rows}")
+
+    await rebuild_aggregates(db)
+    await db.execute(text("ANALYZE mood_entries"))
+    await db.execute(text("ANALYZE journal_entries"))
+    await db.commit()
+
+
+async def rebuild_aggregates(db):
+    # Seeding bypasses crud, so rebuild the tables the app normally maintains incrementally
+    print("Rebuilding mood_tag_counts...")
+    await db.execute(text("TRUNCATE mood_tag_counts"))
+    await db.execute(text(
+        "INSERT INTO mood_tag_counts (owner_id, tag, count) "
+        "SELECT owner_id, tag, count(*) FROM mood_entries, unnest(tags) AS tag GROUP BY owner_id, tag"
+    ))
+    print("Rebuilding mood_daily_rollup...")
+    await db.execute(text("TRUNCATE mood_daily_rollup"))
+    await db.execute(text(
+        "INSERT INTO mood_daily_rollup (owner_id, day, sum, count) "
+        "SELECT owner_id, date(timestamp), sum(mood_value), count(*) FROM mood_entries GROUP BY owner_id, date(timestamp)"
+    ))
+    print("Rebuilding journal_streaks...")
+    await db.execute(text("TRUNCATE journal_streaks"))
+    await db.execute(text(
+        "INSERT INTO journal_streaks (owner_id, current_streak, longest_streak, last_entry_date) "
+        "SELECT owner_id, (array_agg(length ORDER BY last_day DESC))[1], max(length), max(last_day) FROM ("
+        "SELECT owner_id, count(*) AS length, max(day) AS last_day FROM ("
+        "SELECT owner_id, day, day - (row_number() OVER (PARTITION BY owner_id ORDER BY day))::int AS grp "
+        "FROM (SELECT DISTINCT owner_id, date(timestamp) AS day FROM journal_entries) d"
+        ") r GROUP BY owner_id, grp) islands GROUP BY owner_id"
+    ))
+    await db.commit()
+
+
+async def bench_user_ids(db):
+    result = await db.execute(text("SELECT id FROM users WHERE email LIKE :pattern ORDER BY id"), {"pattern": BENCH_EMAIL_PREFIX + "%"})
+    return [r[0] for r in result]
+
+
+async def set_indexes(db, present: bool):
+    for name, ddl in INDEX_DDL.items():
+        await db.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if present:
+            await db.execute(text(ddl))
+    await db.execute(text("ANALYZE mood_entries"))
+    await db.execute(text("ANALYZE journal_entries"))
+    await db.commit()
+
+
+async def time_queries(db, user_id: int, repeat: int):
+    queries = {
+        "get_mood_trends(365d)": lambda: crud.get_mood_trends(db, user_id, days=365),
+        "get_journal_streak": lambda: crud.get_journal_streak(db, user_id),
+        "get_most_frequent_mood_tags": lambda: crud.get_most_frequent_mood_tags(db, user_id),
+        "get_average_mood_by_day_of_week": lambda: crud.get_average_mood_by_day_of_week(db, user_id),
+    }
+    report = {}
+    for name, run in queries.items():
+        await run() # Warm caches
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await run()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        report[name] = (statistics.median(samples), samples[int(0.95 * (len(samples) - 1))])
+    return report
+
+
+def print_report(title, report):
+    print(f"\n{title}")
+    for name, (p50, p95) in report.items():
+        print(f"  {name:<32} p50 {p50:9.2f} ms   p95 {p95:9.2f} ms")
+
+
+async def run_benchmark(db, args):
+    if not args.skip_seed:
+        await seed(db, args.users, args.rows, args.journal_rows)
+    user_ids = await bench_user_ids(db)
+    if not user_ids:
+        print("No benchmark users found. Run without --skip-seed first.")
+        return
+    user_id = user_ids[0]
+
+    if args.compare:
+        await set_indexes(db, present=False)
+        print_report("Without per-user indexes", await time_queries(db, user_id, args.repeat))
+        await set_indexes(db, present=True)
+    print_report("With per-user indexes", await time_queries(db, user_id, args.repeat))
+
+
+async def main():
+    args = parse_args()
+    insights_cache.set_backend(None) # Time the queries, not cache hits
+    try:
+        async with AsyncSessionLocal() as db:
+            await run_benchmark(db, args)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Shows whether bcrypt work blocks the event loop during a burst of concurrent logins.
+
+In-process mode (default, no database needed) runs --logins password verifications with
+--concurrency in flight, once inline on the event loop (the old login path) and once through
+the password thread pool, while a probe coroutine measures how late the loop wakes it up:
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 50
+
+Server mode fires real logins at a running API and times GET /health/live alongside them:
+
+    python -m benchmarks.bench_login --url http://localhost:8000 --email bench@example.com --password secret
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.auth import security
+from app.config import settings
+
+PROBE_INTERVAL_SECONDS = 0.01
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200, help="Total login attempts")
+    parser.add_argument("--concurrency", type=int, default=50, help="Login attempts in flight at once")
+    parser.add_argument("--url", default=None, help="Benchmark a running API instead of in-process verification")
+    parser.add_argument("--email", default=None, help="Existing account used in server mode")
+    parser.add_argument("--password", default=None, help="Password of --email")
+    return parser.parse_args()
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+async def run_burst(login, logins: int, concurrency: int):
+    """Runs `logins` calls of `login` with bounded concurrency; returns (elapsed seconds, failures)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            if not await login():
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start, failures
+
+
+async def measure(login, probe, logins: int, concurrency: int):
+    """Runs a login burst while `probe` samples responsiveness; returns (elapsed, failures, probe samples in ms)."""
+    samples = []
+    done = asyncio.Event()
+
+    async def probe_loop():
+        while not done.is_set():
+            samples.append(await probe())
+
+    probe_task = asyncio.create_task(probe_loop())
+    try:
+        elapsed, failures = await run_burst(login, logins, concurrency)
+    finally:
+        done.set()
+        await probe_task
+    return elapsed, failures, samples
+
+
+async def loop_lag_probe():
+    # How much later than requested the loop resumed us
+    start = time.perf_counter()
+    await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+    return (time.perf_counter() - start - PROBE_INTERVAL_SECONDS) * 1000
+
+
+def print_report(title, logins, elapsed, failures, samples, probe_name):
+    print(f"\n{title}")
+    print(f"  {logins} logins in {elapsed:.2f}s ({logins / elapsed:.1f}/s), {failures} failed")
+    if samples:
+        print(
+            f"  {probe_name}: p50 {statistics.median(samples):8.2f} ms   p99 {percentile(samples, 0.99):8.2f} ms   "
+            f"max {max(samples):8.2f} ms   ({len(samples)} samples)"
+        )
+    else:
+        print(f"  {probe_name}: no samples (the loop never ran the probe during the burst)")
+
+
+async def bench_in_process(args):
+    password = "correct horse battery staple"
+    hashed = security.get_password_hash(password)
+    print(f"bcrypt rounds {security.pwd_context.handler('bcrypt').default_rounds}, password pool {settings.PASSWORD_HASH_WORKERS} threads")
+
+    async def inline_login():
+        return security.verify_password(password, hashed)
+
+    async def pooled_login():
+        verified, _ = await security.verify_and_update_password(password, hashed)
+        return verified
+
+    for title, login in (("Inline on the event loop", inline_login), ("Password thread pool", pooled_login)):
+        elapsed, failures, samples = await measure(login, loop_lag_probe, args.logins, args.concurrency)
+        print_report(title, args.logins, elapsed, failures, samples, "event loop lag")
+
+
+async def bench_server(args):
+    import httpx
+
+    if not args.email or not args.password:
+        raise SystemExit("--email and --password are required with --url")
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        async def login():
+            response = await client.post("/auth/token", data={"username": args.email, "password": args.password})
+            return response.status_code == 200
+
+        async def liveness_probe():
+            start = time.perf_counter()
+            await client.get("/health/live")
+            await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+            return (time.perf_counter() - start - PROBE_INTERVAL_SECONDS) * 1000
+
+        elapsed, failures, samples = await measure(login, liveness_probe, args.logins, args.concurrency)
+        print_report(f"Server {args.url}", args.logins, elapsed, failures, samples, "GET /health/live latency")
+
+
+def main():
+    args = parse_args()
+    asyncio.run(bench_server(args) if args.url else bench_in_process(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Compares response building for 100-entry mood/journal pages: the default path (ORM objects
+validated through the response_model and encoded with the stdlib json module) against
+orjson, and against the lean FAST_JSON_RESPONSES path (column-selected row dicts -> orjson).
+
+Serialization only, on synthetic entries (no database needed):
+
+    python -m benchmarks.bench_serialization --page-size 100 --repeat 2000
+
+Including the query, against users seeded by bench_insight_queries:
+
+    python -m benchmarks.bench_serialization --db
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import crud, models, schemas
+from app.database import AsyncSessionLocal, engine
+from app.responses import FastJSONResponse
+
+BENCH_EMAIL_PREFIX = "bench_user_"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=100, help="Entries per response")
+    parser.add_argument("--repeat", type=int, default=2000, help="Timed runs per path")
+    parser.add_argument("--db", action="store_true", help="Time query + serialization against the database")
+    return parser.parse_args()
+
+
+def default_render(adapter: TypeAdapter, entries) -> bytes:
+    # What FastAPI does for a response_model with the stdlib JSONResponse
+    validated = adapter.validate_python(entries, from_attributes=True)
+    return json.dumps(adapter.dump_python(validated, mode="json"), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_render(adapter: TypeAdapter, entries) -> bytes:
+    # response_model validation, then the orjson response class
+    validated = adapter.validate_python(entries, from_attributes=True)
+    return FastJSONResponse(adapter.dump_python(validated, mode="json")).body
+
+
+def lean_render(rows) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def synthetic_entries(kind: str, page_size: int):
+    now = datetime.now(timezone.utc)
+    entries, rows = [], []
+    for i in range(page_size):
+        if kind == "mood":
+            row = {
+                "id": i + 1, "mood_value": 1 + i % 5, "notes": f"Synthetic note {i}",
+                "timestamp": now - timedelta(hours=i), "owner_id": 1, "tags": ["work", "stress"] if i % 2 else ["sleep"],
+            }
+            entries.append(models.MoodEntry(**row))
+        else:
+            row = {
+                "id": i + 1, "title": f"Entry {i}", "content": "Synthetic benchmark journal entry. " * 20,
+                "timestamp": now - timedelta(hours=i), "owner_id": 1, "sentiment_label": "Neutral",
+                "sentiment_score": 0.0, "sentiment_status": "done",
+            }
+            entries.append(models.JournalEntry(**row))
+        rows.append(row)
+    return entries, rows
+
+
+def time_sync(run, repeat: int):
+    run() # Warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def time_async(run, repeat: int):
+    await run() # Warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def print_report(title: str, report):
+    print(f"\n{title}")
+    for name, samples in report.items():
+        samples.sort()
+        p99 = samples[int(0.99 * (len(samples) - 1))]
+        print(f"  {name:<40} p50 {statistics.median(samples):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+def bench_synthetic(args):
+    for kind, schema in (("mood", schemas.MoodEntry), ("journal", schemas.JournalEntry)):
+        adapter = TypeAdapter(List[schema])
+        entries, rows = synthetic_entries(kind, args.page_size)
+        print_report(f"{kind}: {args.page_size}-entry page, serialization only", {
+            "response_model + stdlib json": time_sync(lambda: default_render(adapter, entries), args.repeat),
+            "response_model + orjson": time_sync(lambda: orjson_render(adapter, entries), args.repeat),
+            "lean rows + orjson": time_sync(lambda: lean_render(rows), args.repeat),
+        })
+
+
+async def bench_db(args):
+    async with AsyncSessionLocal() as db:
+        user_id = await db.scalar(
+            select(models.User.id).where(models.User.email.like(BENCH_EMAIL_PREFIX + "%")).order_by(models.User.id).limit(1)
+        )
+        if user_id is None:
+            print("No benchmark users found. Seed them with python -m benchmarks.bench_insight_queries first.")
+            return
+        paths = (
+            ("mood", schemas.MoodEntry, crud.get_user_mood_entries, crud.get_user_mood_entry_rows),
+            ("journal", schemas.JournalEntry, crud.get_user_journal_entries, crud.get_user_journal_entry_rows),
+        )
+        for kind, schema, orm_query, lean_query in paths:
+            adapter = TypeAdapter(List[schema])
+
+            async def default_path():
+                entries = await orm_query(db, user_id, limit=args.page_size)
+                default_render(adapter, entries)
+                db.expunge_all() # Don't let the identity map turn later queries into cache hits
+
+            async def lean_path():
+                lean_render(await lean_query(db, user_id, limit=args.page_size))
+
+            print_report(f"{kind}: {args.page_size}-entry page, query + serialization", {
+                "ORM + response_model + stdlib json": await time_async(default_path, args.repeat),
+                "lean rows + orjson": await time_async(lean_path, args.repeat),
+            })
+
+
+async def run_db(args):
+    try:
+        await bench_db(args)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    args = parse_args()
+    if args.db:
+        asyncio.run(run_db(args))
+    else:
+        bench_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
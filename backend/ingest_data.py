@@ -1,11 +1,21 @@
+import argparse
+import hashlib
+import json
 import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
 from dotenv import load_dotenv
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, DirectoryLoader
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import SentenceTransformerEmbeddings
 from langchain_community.vectorstores import Chroma
 
-# Load environment variables (not strictly needed for this script, but good practice)
+from app.services.embeddings import embedding_model_id, get_embeddings
+
+# Load environment variables (embedding settings are read through app/config.py)
 load_dotenv()
 
 # --- Configuration ---
@@ -13,86 +23,303 @@ load_dotenv()
 DATA_PATH = "../data"
 # Directory where ChromaDB's persistent data will be stored (relative to backend/ folder)
 CHROMA_PERSIST_DIRECTORY = "./chroma_db"
-# Name of the embedding model to use (needs `sentence-transformers` installed)
-EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Per-file content hashes, size/mtime and chunk counts from the last run, stored next to the vectors
+MANIFEST_PATH = os.path.join(CHROMA_PERSIST_DIRECTORY, "ingest_manifest.json")
+MANIFEST_VERSION = 1
+# Extracted text per file content hash, so unchanged PDFs are never parsed twice (e.g. on --rebuild
+# or after a chunking change)
+TEXT_CACHE_DIRECTORY = "./ingest_cache/text"
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".pdf")
+CHUNK_SIZE = 1000      # Max characters in each chunk
+CHUNK_OVERLAP = 200    # Overlap between chunks to maintain context
+ADD_BATCH_SIZE = 256   # Chunks embedded and written per Chroma call
 # --- End Configuration ---
 
 
-def run_ingestion():
-    print("Starting document ingestion...")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync the chatbot knowledge base in ChromaDB with the documents under data/.")
+    parser.add_argument("--rebuild", action="store_true", help="Drop the collection and re-embed every document")
+    parser.add_argument("--workers", type=int, default=None, help="Processes extracting and splitting documents (default: CPU count; 1 runs inline)")
+    return parser.parse_args()
+
+
+def discover_files() -> Dict[str, str]:
+    """Maps each supported document's path relative to DATA_PATH (the manifest key) to its full path."""
+    files = {}
+    for root, _, names in os.walk(DATA_PATH):
+        for name in names:
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, DATA_PATH).replace(os.sep, "/")] = path
+    return dict(sorted(files.items()))
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(relpath: str, content_hash: str, index: int) -> str:
+    # Deterministic, so re-adding a file's chunks after an interrupted run overwrites instead of duplicating
+    return hashlib.sha256(f"{relpath}\0{content_hash}\0{index}".encode("utf-8")).hexdigest()
+
+
+def chunk_ids(relpath: str, entry: dict) -> List[str]:
+    return [chunk_id(relpath, entry["sha256"], i) for i in range(entry["chunks"])]
+
 
-    # 1. Load Documents from the 'data' directory
-    print(f"Attempting to load documents from: {DATA_PATH}")
-    all_docs = []
+def ingestion_settings() -> dict:
+    # Changing any of these invalidates every stored vector, so it forces a full rebuild
+    return {"embedding_model": embedding_model_id(), "chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP}
 
-    # Load Text and Markdown files using TextLoader
+
+def load_manifest() -> Optional[dict]:
     try:
-        text_loader = DirectoryLoader(
-            DATA_PATH,
-            glob="**/*.txt",  # Matches .txt files
-            loader_cls=TextLoader,
-            loader_kwargs={'autodetect_encoding': True} # Helps with various encodings
-        )
-        md_loader = DirectoryLoader(
-            DATA_PATH,
-            glob="**/*.md",   # Matches .md (Markdown) files
-            loader_cls=TextLoader,
-            loader_kwargs={'autodetect_encoding': True}
-        )
-        all_docs.extend(text_loader.load())
-        all_docs.extend(md_loader.load())
-        print(f"Loaded {len(all_docs)} text/markdown documents so far.")
-    except Exception as e:
-        print(f"Warning: Could not load text/markdown files. Error: {e}")
-
-    # Load PDF files using PyPDFLoader
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(manifest: dict):
+    # Write-then-rename so an interrupted run never leaves a truncated manifest
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def load_file(path: str):
+    if path.lower().endswith(".pdf"):
+        return PyPDFLoader(path).load() # Requires 'pypdf': pip install pypdf
+    return TextLoader(path, autodetect_encoding=True).load() # Helps with various encodings
+
+
+def text_cache_path(content_hash: str) -> str:
+    return os.path.join(TEXT_CACHE_DIRECTORY, f"{content_hash}.json")
+
+
+def read_text_cache(content_hash: str, path: str) -> Optional[List[Document]]:
     try:
-        pdf_loader = DirectoryLoader(
-            DATA_PATH,
-            glob="**/*.pdf",  # Matches .pdf files
-            loader_cls=PyPDFLoader
-        )
-        all_docs.extend(pdf_loader.load())
-        print(f"Loaded a total of {len(all_docs)} documents including PDFs.")
-    except Exception as e:
-        print(f"Warning: Could not load PDF files. Ensure 'pypdf' is installed. Error: {e}")
-        # Ensure pypdf is installed: pip install pypdf
-
-    if not all_docs:
-        print("No documents loaded. Please check your data/ directory and file types (.txt, .md, .pdf).")
-        return
+        with open(text_cache_path(content_hash), encoding="utf-8") as f:
+            cached = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    # Identical content may live under another name, so point the metadata at this copy
+    return [Document(page_content=d["page_content"], metadata={**d["metadata"], "source": path}) for d in cached]
+
+
+def write_text_cache(content_hash: str, docs: List[Document]):
+    os.makedirs(TEXT_CACHE_DIRECTORY, exist_ok=True)
+    tmp_path = f"{text_cache_path(content_hash)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump([{"page_content": d.page_content, "metadata": d.metadata} for d in docs], f, default=str)
+    os.replace(tmp_path, text_cache_path(content_hash))
 
-    # 2. Split Documents into Chunks
-    print(f"Splitting {len(all_docs)} documents into smaller chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,      # Max characters in each chunk
-        chunk_overlap=200,    # Overlap between chunks to maintain context
+
+def make_text_splitter():
+    return RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
         length_function=len,  # Use character length for chunking
         is_separator_regex=False, # Not using regex for separators
     )
-    chunks = text_splitter.split_documents(all_docs)
-    print(f"Split into {len(chunks)} chunks.")
 
-    # 3. Create Embeddings
-    print(f"Initializing embedding model: {EMBEDDING_MODEL_NAME}...")
-    # Ensure 'sentence-transformers' is installed in your venv: pip install sentence-transformers
-    embeddings = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL_NAME)
 
-    # 4. Store in ChromaDB
-    print(f"Storing embeddings and chunks in ChromaDB at: {CHROMA_PERSIST_DIRECTORY}")
+def extract_and_split(path: str, content_hash: str):
+    """
+    Loader stage, run in a worker process: extracts a file's text (from the text cache when this
+    exact content was parsed before) and splits it. Returns (chunks, cache hit, extract seconds,
+    split seconds).
+    """
+    start = time.perf_counter()
+    docs = read_text_cache(content_hash, path)
+    cache_hit = docs is not None
+    if not cache_hit:
+        docs = load_file(path)
+        write_text_cache(content_hash, docs)
+    extracted = time.perf_counter()
+    chunks = make_text_splitter().split_documents(docs)
+    return chunks, cache_hit, extracted - start, time.perf_counter() - extracted
+
+
+def iter_extracted(jobs: Dict[str, Tuple[str, str]], workers: int):
+    """
+    Yields (relpath, result, error) for each {relpath: (path, content_hash)} job as soon as it's
+    done, so the main process embeds one file while the pool is still parsing the next ones.
+    """
+    if workers <= 1:
+        for relpath, (path, content_hash) in jobs.items():
+            try:
+                yield relpath, extract_and_split(path, content_hash), None
+            except Exception as e:
+                yield relpath, None, e
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(extract_and_split, path, content_hash): relpath for relpath, (path, content_hash) in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+
+def plan_sync(hashes: Dict[str, str], manifest_files: Dict[str, dict]) -> Tuple[List[str], List[str], List[str]]:
+    """Returns (added, changed, removed) paths relative to DATA_PATH."""
+    added = [p for p in hashes if p not in manifest_files]
+    changed = [p for p in hashes if p in manifest_files and manifest_files[p]["sha256"] != hashes[p]]
+    removed = [p for p in manifest_files if p not in hashes]
+    return added, changed, removed
 
-    # Ensure the directory exists
+
+def hash_files(files: Dict[str, str], previous_files: Dict[str, dict]) -> Tuple[Dict[str, str], Dict[str, dict], int]:
+    """
+    Returns ({relpath: sha256}, {relpath: stat fields for the manifest}, hashes reused). A file whose
+    size and mtime match the previous manifest keeps its recorded hash instead of being re-read.
+    """
+    hashes, stats, reused = {}, {}, 0
+    for relpath, path in files.items():
+        st = os.stat(path)
+        stats[relpath] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        previous = previous_files.get(relpath)
+        if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+            hashes[relpath] = previous["sha256"]
+            reused += 1
+        else:
+            hashes[relpath] = file_hash(path)
+    return hashes, stats, reused
+
+
+def open_vectordb(embeddings=None):
     os.makedirs(CHROMA_PERSIST_DIRECTORY, exist_ok=True)
+    return Chroma(persist_directory=CHROMA_PERSIST_DIRECTORY, embedding_function=embeddings)
 
-    # Initialize Chroma vector store with persistence
-    # This will create new data or load existing data if the directory is not empty
-    db = Chroma.from_documents(
-        documents=chunks,
-        embedding=embeddings,
-        persist_directory=CHROMA_PERSIST_DIRECTORY
-    )
-    db.persist() # Explicitly persist changes to disk
-    print("Document ingestion complete! ChromaDB updated.")
+
+def print_timings(timings: Dict[str, float], notes: Dict[str, str]):
+    print("Stage timings:")
+    for name, seconds in timings.items():
+        print(f"  {name:<24} {seconds:8.2f}s  {notes.get(name, '')}")
+
+
+def run_ingestion(rebuild: bool = False, workers: Optional[int] = None):
+    print("Starting document ingestion...")
+    run_start = time.perf_counter()
+    timings, notes = {}, {}
+    workers = workers or os.cpu_count() or 1
+
+    # 1. Hash the documents in the 'data' directory
+    print(f"Scanning documents in: {DATA_PATH}")
+    stage_start = time.perf_counter()
+    previous_manifest = load_manifest()
+    files = discover_files()
+    hashes, stats, reused = hash_files(files, previous_manifest["files"] if previous_manifest else {})
+    timings["scan + hash"] = time.perf_counter() - stage_start
+    notes["scan + hash"] = f"{len(files)} files, {reused} unchanged by size/mtime"
+    print(f"Found {len(files)} documents (.txt, .md, .pdf).")
+
+    # 2. Compare against the manifest from the last run
+    manifest = previous_manifest
+    reset_reason = None
+    if rebuild:
+        reset_reason = "--rebuild requested"
+    elif manifest is None:
+        reset_reason = "no ingest manifest found"
+    elif manifest["settings"] != ingestion_settings():
+        reset_reason = f"ingestion settings changed ({manifest['settings']} -> {ingestion_settings()})"
+    if reset_reason:
+        # A fresh collection id tells the API its open Chroma handle points at a dropped collection
+        manifest = {"version": MANIFEST_VERSION, "settings": ingestion_settings(), "files": {}, "collection": uuid.uuid4().hex}
+
+    added, changed, removed = plan_sync(hashes, manifest["files"])
+    print(f"{len(added)} added, {len(changed)} changed, {len(removed)} removed, "
+          f"{len(hashes) - len(added) - len(changed)} unchanged.")
+    if not reset_reason and not (added or changed or removed):
+        touched = [relpath for relpath in hashes if any(manifest["files"][relpath].get(k) != v for k, v in stats[relpath].items())]
+        for relpath in touched:
+            manifest["files"][relpath].update(stats[relpath]) # A touched but unchanged file
+        if touched:
+            save_manifest(manifest)
+        print("Knowledge base is up to date. Nothing to ingest.")
+        print_timings(timings, notes)
+        return
+
+    # The embedding model is only loaded when something needs embedding
+    stage_start = time.perf_counter()
+    embeddings = get_embeddings() if (added or changed) else None
+    vectordb = open_vectordb(embeddings)
+    if reset_reason:
+        # Chunks written without a manifest (e.g. by older versions of this script, which appended
+        # duplicates on every run) can't be matched to files, so start from an empty collection
+        print(f"Resetting the ChromaDB collection: {reset_reason}.")
+        vectordb.delete_collection()
+        vectordb = open_vectordb(embeddings)
+    for relpath in hashes:
+        if relpath in manifest["files"]:
+            manifest["files"][relpath].update(stats[relpath])
+    save_manifest(manifest)
+    timings["open store"] = time.perf_counter() - stage_start
+
+    # 3. Delete the chunks of removed and changed files
+    stage_start = time.perf_counter()
+    for relpath in removed + changed:
+        stale_ids = chunk_ids(relpath, manifest["files"][relpath])
+        if stale_ids:
+            vectordb.delete(ids=stale_ids)
+        del manifest["files"][relpath]
+        save_manifest(manifest)
+    timings["delete stale chunks"] = time.perf_counter() - stage_start
+    notes["delete stale chunks"] = f"{len(removed) + len(changed)} files"
+
+    # 4. Extract and split the added and changed files in worker processes, embedding and
+    #    storing each one in this process as soon as it's ready
+    pending = sorted(added + changed)
+    print(f"Extracting {len(pending)} documents with {min(workers, max(len(pending), 1))} worker processes...")
+    jobs = {relpath: (files[relpath], hashes[relpath]) for relpath in pending}
+    extract_seconds = split_seconds = embed_seconds = 0.0
+    total_chunks = cache_hits = failures = 0
+    stage_start = time.perf_counter()
+    for done, (relpath, result, error) in enumerate(iter_extracted(jobs, min(workers, len(jobs))), start=1):
+        if error is not None:
+            # Left out of the manifest, so the next run retries it
+            failures += 1
+            print(f"  [{done}/{len(jobs)}] Warning: Could not load {relpath}. Error: {error}")
+            continue
+        chunks, cache_hit, extract_time, split_time = result
+        cache_hits += cache_hit
+        extract_seconds += extract_time
+        split_seconds += split_time
+
+        embed_start = time.perf_counter()
+        entry = {"sha256": hashes[relpath], "chunks": len(chunks), **stats[relpath]}
+        ids = chunk_ids(relpath, entry)
+        for start in range(0, len(chunks), ADD_BATCH_SIZE):
+            vectordb.add_documents(chunks[start:start + ADD_BATCH_SIZE], ids=ids[start:start + ADD_BATCH_SIZE])
+        manifest["files"][relpath] = entry
+        save_manifest(manifest) # Per file, so an interrupted run resumes where it stopped
+        embed_seconds += time.perf_counter() - embed_start
+        total_chunks += len(chunks)
+        source = "text cache" if cache_hit else f"extracted in {extract_time:.2f}s"
+        print(f"  [{done}/{len(jobs)}] {relpath}: {len(chunks)} chunks ({source})")
+
+    timings["load + split + embed"] = time.perf_counter() - stage_start
+    notes["load + split + embed"] = "wall time; the stages below overlap across processes"
+    timings["  extract (workers)"] = extract_seconds
+    notes["  extract (workers)"] = f"{len(jobs) - cache_hits - failures} parsed, {cache_hits} from text cache, {failures} failed"
+    timings["  split (workers)"] = split_seconds
+    timings["  embed + store"] = embed_seconds
+    notes["  embed + store"] = f"{total_chunks} chunks"
+    timings["total"] = time.perf_counter() - run_start
+
+    # ChromaDB persists writes to CHROMA_PERSIST_DIRECTORY as they happen
+    print(f"Document ingestion complete! Embedded {total_chunks} chunks; ChromaDB at {CHROMA_PERSIST_DIRECTORY} updated.")
+    print_timings(timings, notes)
 
 if __name__ == "__main__":
-    run_ingestion()
\ No newline at end of file
+    args = parse_args()
+    run_ingestion(rebuild=args.rebuild, workers=args.workers)
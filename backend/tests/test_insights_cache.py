@@ -0,0 +1,88 @@
+import asyncio
+
+from app.services import insights_cache as insights_cache_module
+from app.services.insights_cache import InsightsCache, RedisCacheBackend
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio with a controllable clock for `ex` expiry."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._values = {}
+
+    async def get(self, key):
+        value, expires_at = self._values.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.now:
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        assert ex is None or ex > 0, "Redis rejects a non-positive ex"
+        self._values[key] = (value, self.now + ex if ex else None)
+
+
+def make_cache(ttl=60):
+    client = FakeRedis()
+    versions = {"mood": 1, "journal": 1, "chat": 1}
+
+    async def get_versions(db, user_id):
+        return dict(versions)
+
+    cache = InsightsCache(RedisCacheBackend(client, ttl=ttl), versions=get_versions)
+    calls = []
+
+    @cache.cached("summary")
+    async def summary(db, user_id, days=7):
+        calls.append((user_id, days))
+        return {"user": user_id, "days": days, "calls": len(calls)}
+
+    return client, versions, calls, summary
+
+
+def test_repeated_call_is_served_from_the_cache():
+    _, _, calls, summary = make_cache()
+    first = asyncio.run(summary(None, 1))
+    assert asyncio.run(summary(None, 1)) == first
+    assert len(calls) == 1
+
+
+def test_arguments_and_users_are_cached_separately():
+    _, _, calls, summary = make_cache()
+    asyncio.run(summary(None, 1, days=7))
+    asyncio.run(summary(None, 1, days=30))
+    asyncio.run(summary(None, 2, days=7))
+    assert len(calls) == 3
+
+
+def test_version_bump_invalidates():
+    _, versions, calls, summary = make_cache()
+    asyncio.run(summary(None, 1))
+    versions["journal"] += 1
+    assert asyncio.run(summary(None, 1))["calls"] == 2
+
+
+def test_chat_version_bump_keeps_entries():
+    _, versions, calls, summary = make_cache()
+    asyncio.run(summary(None, 1))
+    versions["chat"] += 1
+    asyncio.run(summary(None, 1))
+    assert len(calls) == 1
+
+
+def test_entries_expire_after_ttl():
+    client, _, calls, summary = make_cache(ttl=60)
+    asyncio.run(summary(None, 1))
+    client.now += 59
+    asyncio.run(summary(None, 1))
+    assert len(calls) == 1
+    client.now += 2
+    asyncio.run(summary(None, 1))
+    assert len(calls) == 2
+
+
+def test_zero_ttl_disables_the_cache(monkeypatch):
+    monkeypatch.setattr(insights_cache_module.settings, "INSIGHTS_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(insights_cache_module.settings, "INSIGHTS_CACHE_BACKEND", "redis")
+    assert insights_cache_module._create_backend() is None
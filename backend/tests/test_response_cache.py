@@ -0,0 +1,82 @@
+import pytest
+
+from app.services import response_cache as response_cache_module
+from app.services.response_cache import SemanticResponseCache, is_knowledge_only
+
+
+@pytest.mark.parametrize("question", [
+    "How do I deal with stress?",
+    "What are good sleep habits?",
+    "How can I build better coping skills",
+    "What is cognitive behavioural therapy?",
+])
+def test_generic_questions_are_knowledge_only(question):
+    assert is_knowledge_only(question)
+
+
+@pytest.mark.parametrize("question", [
+    "Why do I want to die",
+    "I’m so anxious lately",
+    "I'm so anxious lately",
+    "I hate everyone at work",
+    "how do i stop my panic attacks",
+    "Is it normal to feel like this about me?",
+    "What are the warning signs of suicide?",
+    "How do I help a friend who self-harms?",
+    "Can an overdose of sleeping pills be dangerous?",
+])
+def test_personal_and_crisis_questions_are_never_cached(question):
+    assert not is_knowledge_only(question)
+
+
+def test_every_phrasing_must_be_knowledge_only():
+    # The condensed question can drop the first person; the original message still counts
+    assert not is_knowledge_only("I feel awful, what helps with stress?", "What helps with stress?")
+
+
+def make_cache(**overrides):
+    options = {"maxsize": 10, "ttl": 60, "threshold": 0.95}
+    options.update(overrides)
+    return SemanticResponseCache(**options)
+
+
+def test_similar_question_hits_and_dissimilar_misses():
+    cache = make_cache()
+    cache.put([1.0, 0.0, 0.0], "answer", [{"content": "doc"}], version=1)
+    assert cache.get([0.99, 0.05, 0.0], version=1) == {"response": "answer", "sources": [{"content": "doc"}]}
+    assert cache.get([0.5, 0.5, 0.0], version=1) is None
+
+
+def test_threshold_is_inclusive_cosine_similarity():
+    cache = make_cache(threshold=0.8)
+    cache.put([1.0, 0.0], "answer", [], version=1)
+    assert cache.get([0.8, 0.6], version=1) is not None # cos = 0.8
+    assert cache.get([0.7, 0.714], version=1) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache_module.time, "monotonic", lambda: now[0])
+    cache = make_cache(ttl=10)
+    cache.put([1.0, 0.0], "answer", [], version=1)
+    now[0] += 9
+    assert cache.get([1.0, 0.0], version=1) is not None
+    now[0] += 2
+    assert cache.get([1.0, 0.0], version=1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(maxsize=2)
+    cache.put([1.0, 0.0, 0.0], "a", [], version=1)
+    cache.put([0.0, 1.0, 0.0], "b", [], version=1)
+    assert cache.get([1.0, 0.0, 0.0], version=1)["response"] == "a" # "b" is now least recently used
+    cache.put([0.0, 0.0, 1.0], "c", [], version=1)
+    assert cache.get([0.0, 1.0, 0.0], version=1) is None
+    assert cache.get([1.0, 0.0, 0.0], version=1)["response"] == "a"
+    assert cache.get([0.0, 0.0, 1.0], version=1)["response"] == "c"
+
+
+def test_knowledge_base_version_change_clears_entries():
+    cache = make_cache()
+    cache.put([1.0, 0.0], "answer", [], version=1)
+    assert cache.get([1.0, 0.0], version=2) is None
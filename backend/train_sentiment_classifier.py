@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import os
+
+import joblib
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+from sqlalchemy import select
+
+from app import models
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.services.embeddings import embedding_model_id, get_embeddings
+from app.services.sentiment_classifier import SENTIMENT_LABELS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the local sentiment classifier head on LLM-labelled journal entries.")
+    parser.add_argument("--output", default=settings.SENTIMENT_CLASSIFIER_PATH, help="Where to write the joblib artifact")
+    parser.add_argument("--min-samples", type=int, default=200, help="Refuse to train with fewer labelled entries")
+    parser.add_argument("--test-size", type=float, default=0.2, help="Held-out fraction used for the evaluation report")
+    return parser.parse_args()
+
+
+async def load_labelled_entries():
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(models.JournalEntry.content, models.JournalEntry.sentiment_label)
+                .where(
+                    models.JournalEntry.sentiment_status == "done",
+                    models.JournalEntry.sentiment_source == "llm", # Never learn from the classifier's own predictions
+                    models.JournalEntry.sentiment_label.in_(SENTIMENT_LABELS)
+                )
+            )).all()
+    finally:
+        await engine.dispose()
+    return [r.content for r in rows], [r.sentiment_label for r in rows]
+
+
+def run_training(args):
+    texts, labels = asyncio.run(load_labelled_entries())
+    print(f"Loaded {len(texts)} labelled journal entries.")
+    if len(texts) < args.min_samples:
+        print(f"Not enough labelled entries to train (need at least {args.min_samples}). Label more entries with SENTIMENT_MODE=llm first.")
+        return
+
+    print(f"Embedding entries with {embedding_model_id()}...")
+    vectors = get_embeddings().embed_documents(texts)
+
+    x_train, x_test, y_train, y_test = train_test_split(vectors, labels, test_size=args.test_size, stratify=labels, random_state=42)
+    model = LogisticRegression(max_iter=1000, class_weight="balanced")
+    model.fit(x_train, y_train)
+    print(classification_report(y_test, model.predict(x_test)))
+
+    # Refit on everything before saving
+    model.fit(vectors, labels)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump({"model": model, "embedding_model": embedding_model_id()}, args.output)
+    print(f"Saved sentiment classifier to {args.output}. Enable it with SENTIMENT_MODE=hybrid (or local).")
+
+
+if __name__ == "__main__":
+    run_training(parse_args())
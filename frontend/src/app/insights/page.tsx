@@ -26,6 +26,12 @@ interface SentimentSummary {
   most_common_sentiment: string;
 }
 
+interface InsightsDashboard {
+  mood_tags: TagInsight[];
+  mood_avg_by_day: DayOfWeekMood[];
+  sentiment_summary: SentimentSummary;
+}
+
 // Constants for chart colors
 const PIE_COLORS = ['#82ca9d', '#ffc658', '#8884d8']; // Positive, Neutral, Negative (adjust as needed)
 const BAR_COLORS = ['#8884d8', '#82ca9d', '#ffc658', '#FF8042', '#AF19FF', '#FF0000', '#00C49F']; // Example colors for days
@@ -58,40 +64,24 @@ export default function InsightsPage() {
 
   const fetchInsights = async () => {
     setError(null);
-
-    // Fetch Mood Tags
     setLoadingTags(true);
-    try {
-      const response = await apiClient.get<TagInsight[]>('/insights/mood/tags');
-      setMoodTags(response.data);
-    } catch (err) {
-      console.error('Failed to fetch mood tags:', err);
-      setError('Failed to load mood tag insights.');
-    } finally {
-      setLoadingTags(false);
-    }
-
-    // Fetch Mood by Day of Week
     setLoadingMoodByDay(true);
-    try {
-      const response = await apiClient.get<DayOfWeekMood[]>('/insights/mood/avg-by-day');
-      setMoodByDayOfWeek(response.data);
-    } catch (err) {
-      console.error('Failed to fetch mood by day of week:', err);
-      setError('Failed to load mood by day insights.');
-    } finally {
-      setLoadingMoodByDay(false);
-    }
-
-    // Fetch Journal Sentiment Summary
     setLoadingSentimentSummary(true);
+
+    // One request (and one DB round-trip) for all three insight sections
     try {
-      const response = await apiClient.get<SentimentSummary>('/insights/journal/sentiment-summary');
-      setJournalSentimentSummary(response.data);
+      const response = await apiClient.get<InsightsDashboard>('/insights/dashboard', {
+        params: { sections: 'mood_tags,mood_avg_by_day,sentiment_summary' },
+      });
+      setMoodTags(response.data.mood_tags);
+      setMoodByDayOfWeek(response.data.mood_avg_by_day);
+      setJournalSentimentSummary(response.data.sentiment_summary);
     } catch (err) {
-      console.error('Failed to fetch journal sentiment summary:', err);
-      setError('Failed to load journal sentiment summary.');
+      console.error('Failed to fetch insights:', err);
+      setError('Failed to load insights.');
     } finally {
+      setLoadingTags(false);
+      setLoadingMoodByDay(false);
       setLoadingSentimentSummary(false);
     }
   };